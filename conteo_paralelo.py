@@ -0,0 +1,49 @@
+# Coocurrencias XᵀX por bloques de documentos en procesos hijos (map) con suma en árbol (reduce).
+# Módulo liviano a propósito: cada proceso hijo lo importa para encontrar la función que ejecuta, así
+# que aquí solo hay NumPy y SciPy (nada de Tk, matplotlib ni pandas).
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import scipy.sparse as sparse  # Matriz de incidencia documento×keyword (opcional)
+except ImportError:
+    sparse = None
+
+# Medido: XᵀX cuesta ~25-35 ns por producto (nnz² de cada fila) y un proceso hijo tarda ~1.1 s en
+# arrancar (reimporta program.py sin la interfaz). Cada fragmento debe costar al menos ~2 arranques
+# (~3 s de multiplicación); con menos trabajo, repartir es más lento que multiplicar en serie.
+PRODUCTOS_POR_FRAGMENTO = 100_000_000
+
+def fragmentos(costos, procesos, minimo):
+    # Cortes [inicio, fin) con trabajo parejo según el costo de cada fila; una sola parte si el total no
+    # alcanza para darle al menos `minimo` a cada proceso
+    acumulado = np.cumsum(costos)
+    total = int(acumulado[-1]) if len(acumulado) else 0
+    partes = max(1, min(procesos, total // minimo))
+    cortes = np.searchsorted(acumulado, np.linspace(0, total, partes + 1)[1:-1]).tolist()
+    cortes = [0] + cortes + [len(costos)]
+    return list(zip(cortes[:-1], cortes[1:]))
+
+def triangulo_coocurrencias(X):
+    # Map (proceso hijo): triángulo superior de XᵀX de un bloque de documentos, en CSR
+    return sparse.triu(X.T @ X, format="csr")
+
+def reducir_en_arbol(partes):
+    # Sumas por pares en rondas: log2(n) niveles. Sumar dos CSR es una mezcla lineal de filas ordenadas,
+    # no un ordenamiento de todas las claves
+    while len(partes) > 1:
+        partes = [partes[i] + partes[i + 1] if i + 1 < len(partes) else partes[i]
+                  for i in range(0, len(partes), 2)]
+    return partes[0]
+
+def coocurrencias_en_paralelo(X, procesos=1):
+    # triu(XᵀX); con varios procesos y trabajo suficiente, un bloque de filas por proceso
+    cortes = fragmentos(np.diff(X.indptr).astype(np.int64) ** 2, procesos, PRODUCTOS_POR_FRAGMENTO)
+    if len(cortes) == 1:
+        return triangulo_coocurrencias(X)
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(cortes), mp_context=contexto) as pool:
+        partes = list(pool.map(triangulo_coocurrencias, [X[i:j] for i, j in cortes]))
+    return reducir_en_arbol(partes)
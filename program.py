@@ -1,91 +1,2147 @@
-import tkinter as tk
-from tkinter import filedialog, ttk, messagebox, colorchooser
+import numpy as np
 import pandas as pd
-import networkx as nx
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from pandas.api.types import union_categoricals
 import warnings
-import community as community_louvain  # Librería Louvain
+import os
+import json
+import hashlib
+import io
+import gzip
+import lzma
+import bz2
+import zipfile
+import csv
+import re
+import sqlite3
+from itertools import islice
+from contextlib import contextmanager, closing
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from conteo_paralelo import coocurrencias_en_paralelo
+
+if __name__ != "__mp_main__":
+    # Interfaz, dibujo y adaptador networkx. Cada proceso hijo (spawn) vuelve a ejecutar este archivo como
+    # __mp_main__ antes de correr su tarea; los hijos solo leen y cuentan, así no pagan ~1 s en importarlos
+    import tkinter as tk
+    from tkinter import filedialog, ttk, messagebox, colorchooser
+    import networkx as nx
+    import matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.collections import LineCollection
+    import community as community_louvain  # Librería Louvain
+
+try:
+    from python_calamine import CalamineWorkbook  # Lector XLSX en Rust (opcional)
+except ImportError:
+    CalamineWorkbook = None
+
+try:
+    import pyarrow.feather as feather  # Caché columnar en disco (opcional)
+except ImportError:
+    feather = None
+
+try:
+    import scipy.sparse as sparse  # Matriz de incidencia documento×keyword (opcional)
+except ImportError:
+    sparse = None
+
+try:
+    from orjson import loads as json_loads  # Parser JSON rápido (opcional)
+except ImportError:
+    json_loads = json.loads
 
 # Ignorar warning de openpyxl
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
+# Carga en segundo plano
+TAMANO_BLOQUE_CSV = 50_000  # filas por bloque al leer CSV con progreso
+FILAS_VISTA_PREVIA = 200  # filas leídas para poblar los combos antes de la carga completa
+MAX_PROCESOS = os.cpu_count() or 1
+FILAS_POR_REPORTE = 20_000  # cada cuántas filas se reporta progreso en modo streaming
+BASE_CLAVE = 1 << 32  # par de ids (a, b) como clave int64 min·2³²+max, estable al crecer el vocabulario
+PARES_POR_BLOQUE = 1 << 20  # pares (y registros) que se acumulan antes de agregarlos con np.unique
+
+UMBRAL_CATEGORIAS = 0.5  # columnas con menos valores distintos que esta fracción de filas pasan a category
+
+# Archivos comprimidos: los miembros de un .zip se nombran "archivo.zip::miembro.csv"
+SEPARADOR_ZIP = "::"
+DESCOMPRESORES = {".gz": gzip, ".xz": lzma, ".bz2": bz2}
+EXTENSIONES_JSON = (".jsonl", ".ndjson")
+EXTENSIONES_TEXTO = (".txt", ".ris", ".bib", ".nbib") + EXTENSIONES_JSON
+EXTENSIONES_ALMACEN = (".sqlite", ".db")
+EXTENSIONES_DATOS = (".csv", ".xlsx", ".xls") + EXTENSIONES_TEXTO + EXTENSIONES_ALMACEN
+
+# Exportes bibliográficos: columnas de Scopus -> esquema normalizado de registros
+COLUMNAS_SCOPUS = {
+    "Authors": "autores",
+    "Author Keywords": "keywords_autor",
+    "Index Keywords": "keywords_indice",
+    "References": "referencias",
+    "Year": "anio",
+    "Source title": "fuente",
+    "Cited by": "citas",
+    "Title": "titulo",
+    "DOI": "doi",
+    "EID": "id",
+}
+CAMPOS_MULTIVALOR = {"autores", "keywords_autor", "keywords_indice", "referencias"}
+# Exporte de Scopus Sources (CiteScore): una fila por revista, no por documento
+COLUMNAS_FUENTES_SCOPUS = {
+    "Source title": "fuente",
+    "CiteScore": "citescore",
+    "% Cited": "porcentaje_citado",
+    "SNIP": "snip",
+    "SJR": "sjr",
+    "Publisher": "editorial",
+}
+SUFIJOS_FUENTES_SCOPUS = {" Citations": "citas", " Documents": "documentos"}  # "2020-23 Citations", ...
+# Celda "Keywords" en tres líneas: "99.0%\n1/407\nSoftware" -> percentil, rango/tamaño, área temática
+PATRON_RANGO_CITESCORE = r"^\s*(?P<percentil>[\d.]+)%\s*\n\s*(?P<rango>\d+)\s*/\s*(?P<tamano_categoria>\d+)\s*\n\s*(?P<area>.*?)\s*$"
+FORMATOS_DE_REVISTAS = {"scopus_fuentes"}
+# Etiquetas de Web of Science (texto plano y tabulado) -> esquema normalizado
+ETIQUETAS_WOS = {
+    "AU": "autores",
+    "DE": "keywords_autor",
+    "ID": "keywords_indice",
+    "CR": "referencias",
+    "PY": "anio",
+    "SO": "fuente",
+    "TC": "citas",
+    "TI": "titulo",
+    "DI": "doi",
+    "UT": "id",
+}
+ETIQUETAS_UN_VALOR_POR_LINEA = {"AU", "CR"}
+ETIQUETAS_NUMERICAS = {"PY", "TC"}
+CAMPOS_REGISTRO = list(ETIQUETAS_WOS.values())
+# Gestores de referencias (RIS) y PubMed (MEDLINE): etiqueta -> campo normalizado
+ETIQUETAS_RIS = {
+    "AU": "autores", "A1": "autores",
+    "KW": "keywords_autor",
+    "PY": "anio", "Y1": "anio",
+    "TI": "titulo", "T1": "titulo",
+    "T2": "fuente", "JO": "fuente", "JF": "fuente",
+    "DO": "doi",
+    "AN": "id", "ID": "id",
+}
+ETIQUETAS_MEDLINE = {
+    "AU": "autores",
+    "OT": "keywords_autor",
+    "MH": "keywords_indice",
+    "DP": "anio",
+    "TI": "titulo",
+    "JT": "fuente",
+    "PMID": "id",
+}
+CAMPOS_BIBTEX = {"author": "autores", "keywords": "keywords_autor", "year": "anio", "title": "titulo",
+                 "journal": "fuente", "booktitle": "fuente", "doi": "doi"}
+PATRON_CAMPO_BIBTEX = re.compile(r"\s*,?\s*([\w-]+)\s*=\s*")
+REGISTROS_POR_REPORTE = 10_000
+PATRON_PREFIJO_DOI = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:\s*)")
+
+# Almacén SQLite fuera de memoria: registros escalares + tabla larga de campos multivalor
+CAMPOS_ESCALARES = [c for c in CAMPOS_REGISTRO if c not in CAMPOS_MULTIVALOR]
+LOTE_ALMACEN = 5_000
+ESQUEMA_ALMACEN = f"""
+CREATE TABLE IF NOT EXISTS registros (doc INTEGER PRIMARY KEY, {", ".join(CAMPOS_ESCALARES)});
+CREATE TABLE IF NOT EXISTS valores (
+    doc INTEGER NOT NULL, campo TEXT NOT NULL, pos INTEGER NOT NULL, valor TEXT NOT NULL,
+    PRIMARY KEY (doc, campo, pos)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_registros_anio ON registros (anio);
+CREATE INDEX IF NOT EXISTS idx_registros_fuente ON registros (fuente);
+CREATE INDEX IF NOT EXISTS idx_registros_id ON registros (id);
+"""
+NOMBRES_FORMATO = {"almacen": "Almacén SQLite", "scopus": "Scopus", "scopus_fuentes": "Scopus Sources (CiteScore)", "wos": "Web of Science", "wos_tab": "Web of Science (tabulado)",
+                   "ris": "RIS", "bibtex": "BibTeX", "medline": "MEDLINE",
+                   "openalex": "OpenAlex", "crossref": "Crossref"}
+
+# Caché en disco de archivos ya parseados
+DIRECTORIO_CACHE = os.environ.get(
+    "VOSVIEWER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "vosviewer-python"))
+LIMITE_CACHE_MB = 2048  # valor inicial; se puede cambiar desde la interfaz
+MAX_HASHES_RECORDADOS = 500
+INTERVALO_VIGILANCIA_MS = 5000  # revisión periódica de la carpeta vigilada
+FILAS_BLOQUE_DISPOSICION = 512  # nodos por bloque al calcular la repulsión del layout (memoria ~ bloque × nodos)
+
+class CargaCancelada(Exception):
+    pass
+
+# Entradas comprimidas
+def ruta_fisica(filepath):
+    return filepath.split(SEPARADOR_ZIP, 1)[0]
+
+def miembro_zip(filepath):
+    return filepath.split(SEPARADOR_ZIP, 1)[1] if SEPARADOR_ZIP in filepath else ""
+
+def extension_datos(filepath):
+    # Extensión del contenido: "datos.csv.gz" -> ".csv", "exp.zip::a/b.xlsx" -> ".xlsx"
+    base, ext = os.path.splitext((miembro_zip(filepath) or filepath).lower())
+    if ext in DESCOMPRESORES:
+        # Las partes de un snapshot de OpenAlex ("part_000.gz") son JSON Lines sin extensión propia
+        ext = os.path.splitext(base)[1] or ".jsonl"
+    return ext
+
+def es_excel(filepath):
+    return extension_datos(filepath) in (".xlsx", ".xls")
+
+@contextmanager
+def abrir_entrada(filepath):
+    # Devuelve (flujo descomprimido, archivo físico); se descomprime al vuelo, nunca se extrae a disco.
+    # La posición del archivo físico sirve para reportar progreso sobre el tamaño comprimido.
+    with open(ruta_fisica(filepath), "rb") as fisico:
+        miembro = miembro_zip(filepath)
+        if miembro:
+            descompresor = DESCOMPRESORES.get(os.path.splitext(miembro)[1].lower())
+            with zipfile.ZipFile(fisico) as zf, zf.open(miembro) as crudo:
+                if descompresor is None:
+                    yield crudo, fisico
+                else:
+                    # Miembro comprimido (p. ej. datos.zip::a.csv.gz): se descomprime sobre el flujo del zip
+                    with descompresor.open(crudo) as flujo:
+                        yield flujo, fisico
+        elif os.path.splitext(filepath)[1].lower() in DESCOMPRESORES:
+            with DESCOMPRESORES[os.path.splitext(filepath)[1].lower()].open(fisico) as flujo:
+                yield flujo, fisico
+        else:
+            yield fisico, fisico
+
+def fuente_excel(filepath):
+    # openpyxl necesita acceso aleatorio: los libros comprimidos o dentro de un .zip se pasan en memoria
+    if not miembro_zip(filepath) and os.path.splitext(filepath)[1].lower() not in DESCOMPRESORES:
+        return filepath
+    with abrir_entrada(filepath) as (flujo, _):
+        return io.BytesIO(flujo.read())
+
+def expandir_entradas(rutas):
+    # Reemplaza cada .zip por sus miembros CSV/XLSX (incluidos los comprimidos)
+    entradas = []
+    for ruta in rutas:
+        if ruta.lower().endswith(".zip"):
+            with zipfile.ZipFile(ruta) as zf:
+                entradas.extend(f"{ruta}{SEPARADOR_ZIP}{m}" for m in zf.namelist()
+                                if extension_datos(m) in EXTENSIONES_DATOS and not m.endswith("/"))
+        elif extension_datos(ruta) in EXTENSIONES_DATOS:
+            entradas.append(ruta)
+    return entradas
+
+def ejecutar_en_segundo_plano(tarea, al_terminar):
+    # tarea(reportar, cancelado) corre en un hilo; al_terminar(resultado) corre en el hilo de Tk
+    cola = queue.Queue()
+    cancelado = threading.Event()
+    app.evento_cancelar = cancelado
+    boton_cancelar.config(state="normal")
+
+    def trabajador():
+        try:
+            resultado = tarea(lambda texto: cola.put(("progreso", texto)), cancelado)
+            cola.put(("fin", resultado))
+        except CargaCancelada:
+            cola.put(("cancelado", None))
+        except Exception as e:
+            cola.put(("error", e))
+
+    threading.Thread(target=trabajador, daemon=True).start()
+    app.after(100, revisar_cola_carga, cola, al_terminar)
+
+def revisar_cola_carga(cola, al_terminar):
+    try:
+        while True:
+            tipo, valor = cola.get_nowait()
+            if tipo == "progreso":
+                label_estado.config(text=valor)
+                continue
+            app.evento_cancelar = None
+            boton_cancelar.config(state="disabled")
+            if tipo == "fin":
+                try:
+                    al_terminar(valor)
+                except Exception as e:
+                    label_estado.config(text=f"⚠️ Error al cargar: {str(e)}")
+            elif tipo == "cancelado":
+                label_estado.config(text="⛔ Carga cancelada")
+            else:
+                label_estado.config(text=f"⚠️ Error al cargar: {str(valor)}")
+            return
+    except queue.Empty:
+        pass
+    app.after(100, revisar_cola_carga, cola, al_terminar)
+
+def cancelar_carga():
+    if app.evento_cancelar is not None:
+        app.evento_cancelar.set()
+        label_estado.config(text="⏳ Cancelando...")
+
+def leer_csv_con_progreso(filepath, reportar, cancelado, **opciones):
+    total = os.path.getsize(ruta_fisica(filepath)) or 1
+    bloques = []
+    filas = 0
+    with abrir_entrada(filepath) as (flujo, f):
+        for bloque in pd.read_csv(flujo, chunksize=TAMANO_BLOQUE_CSV, **opciones):
+            if cancelado.is_set():
+                raise CargaCancelada()
+            bloques.append(bloque)
+            filas += len(bloque)
+            reportar(f"⏳ Leyendo CSV: {min(100, f.tell() * 100 // total)}% ({filas:,} filas)")
+    if not bloques:
+        return pd.DataFrame()
+    return pd.concat(bloques, ignore_index=True)
+
+def leer_excel_con_progreso(filepath, reportar, cancelado):
+    reportar(f"⏳ Abriendo libro Excel ({os.path.getsize(ruta_fisica(filepath)) / 1e6:.1f} MB)...")
+    excel_file = pd.ExcelFile(fuente_excel(filepath))
+    if cancelado.is_set():
+        excel_file.close()
+        raise CargaCancelada()
+    return excel_file
+
+def obtener_hoja_cruda(hoja, filas):
+    # Rejilla cruda (header=None) de la hoja, leída una sola vez; solo se relee si faltan filas
+    clave = (app.filepath, hoja)
+    grid, completa = app.cache_hojas.get(clave, (None, False))
+    if grid is None or (not completa and len(grid) < filas):
+        filas = max(filas, 2 * len(grid)) if grid is not None else filas
+        grid = app.excel_file.parse(hoja, header=None, nrows=filas)
+        completa = len(grid) < filas
+        app.cache_hojas[clave] = (grid, completa)
+    return grid, completa
+
+def promover_encabezado(grid, fila_ini, col_ini):
+    # Equivale a parse(header=fila_ini) + iloc[:, col_ini:], pero sobre la rejilla en memoria
+    encabezado = grid.iloc[fila_ini, col_ini:]
+    df = grid.iloc[fila_ini + 1:, col_ini:].reset_index(drop=True)
+    df.columns = [f"Unnamed: {col_ini + i}" if pd.isna(v) else v for i, v in enumerate(encabezado)]
+    return df.infer_objects()
+
+def leer_hoja_columnas(filepath, hoja, fila_ini, columnas):
+    # Corre en un proceso hijo: lee una hoja proyectando las columnas por nombre
+    nombres = set(columnas)
+    df = pd.read_excel(fuente_excel(filepath), sheet_name=hoja, header=fila_ini,
+                       usecols=lambda c: str(c) in nombres)
+    df.columns = [str(c) for c in df.columns]
+    faltantes = [c for c in columnas if c not in df.columns]
+    if faltantes:
+        return hoja, None, faltantes
+    return hoja, df[columnas], []
+
+def leer_todas_las_hojas(filepath, hojas, fila_ini, columnas, reportar, cancelado):
+    # Lee todas las hojas en paralelo y las concatena en un solo corpus
+    partes = {}
+    omitidas = []
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(MAX_PROCESOS, len(hojas)), mp_context=contexto) as pool:
+        futuros = [pool.submit(leer_hoja_columnas, filepath, hoja, fila_ini, columnas) for hoja in hojas]
+        for terminadas, futuro in enumerate(as_completed(futuros), start=1):
+            if cancelado.is_set():
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise CargaCancelada()
+            hoja, df, faltantes = futuro.result()
+            if df is None:
+                omitidas.append(hoja)
+                reportar(f"⏳ Hojas {terminadas}/{len(hojas)} · '{hoja}' omitida (sin {', '.join(faltantes)})")
+            else:
+                partes[hoja] = df
+                reportar(f"⏳ Hojas {terminadas}/{len(hojas)} · '{hoja}' ({len(df):,} filas)")
+    if not partes:
+        raise ValueError("Ninguna hoja contiene las columnas seleccionadas.")
+    # Mantener el orden del libro, no el orden de llegada
+    df = pd.concat([partes[h] for h in hojas if h in partes], ignore_index=True)
+    return a_categorias(df), omitidas
+
+def celda_calamine(valor):
+    # calamine entrega todo número como float; openpyxl da int a los enteros. Así ambos motores producen
+    # las mismas etiquetas (2020, no 2020.0)
+    return int(valor) if isinstance(valor, float) and valor.is_integer() else valor
+
+def iterar_filas_xlsx(filepath, hoja, fila_ini, posiciones, reportar, cancelado):
+    # Recorre la hoja fila por fila sin materializarla; solo devuelve las columnas pedidas
+    if CalamineWorkbook is not None:
+        fuente = fuente_excel(filepath)
+        if isinstance(fuente, str):
+            hoja_cal = CalamineWorkbook.from_path(fuente).get_sheet_by_name(hoja)
+        else:
+            hoja_cal = CalamineWorkbook.from_filelike(fuente).get_sheet_by_name(hoja)
+        desfase_col = hoja_cal.start[1] if hoja_cal.start else 0
+        columnas = [p - desfase_col for p in posiciones]
+        filas = (fila for i, fila in enumerate(hoja_cal.iter_rows()) if i > fila_ini)
+        libro = None
+    else:
+        from openpyxl import load_workbook
+        libro = load_workbook(fuente_excel(filepath), read_only=True, data_only=True)
+        columnas = posiciones
+        filas = libro[hoja].iter_rows(min_row=fila_ini + 2, values_only=True)
+    try:
+        for n, fila in enumerate(filas, start=1):
+            if n % FILAS_POR_REPORTE == 0:
+                if cancelado.is_set():
+                    raise CargaCancelada()
+                reportar(f"⏳ Procesando en streaming: {n:,} filas")
+            yield tuple(celda_calamine(fila[c]) if 0 <= c < len(fila) and fila[c] != "" else None for c in columnas)
+    finally:
+        if libro is not None:
+            libro.close()
+
+def iterar_filas_csv(filepath, fila_ini, posiciones, reportar, cancelado):
+    # Lee el CSV por bloques; cada bloque se descarta antes de leer el siguiente
+    total = os.path.getsize(ruta_fisica(filepath)) or 1
+    filas = 0
+    with abrir_entrada(filepath) as (flujo, f):
+        for bloque in pd.read_csv(flujo, header=None, skiprows=fila_ini + 1, usecols=sorted(set(posiciones)),
+                                  chunksize=TAMANO_BLOQUE_CSV):
+            if cancelado.is_set():
+                raise CargaCancelada()
+            filas += len(bloque)
+            reportar(f"⏳ Procesando en streaming: {min(100, f.tell() * 100 // total)}% ({filas:,} filas)")
+            bloque = bloque[posiciones].astype(object)
+            yield from bloque.where(bloque.notna(), None).itertuples(index=False, name=None)
+
+def iterar_filas(filepath, hoja, fila_ini, posiciones, reportar, cancelado):
+    if extension_datos(filepath) == ".xlsx":
+        return iterar_filas_xlsx(filepath, hoja, fila_ini, posiciones, reportar, cancelado)
+    return iterar_filas_csv(filepath, fila_ini, posiciones, reportar, cancelado)
+
+def usar_streaming():
+    if app.formato == "almacen":
+        return True  # el almacén nunca se carga entero: se consulta por bloques
+    if app.formato:
+        return app.modo_streaming.get() and app.formato in ITERADORES_FORMATO
+    return (app.modo_streaming.get() and extension_datos(app.filepath) in (".xlsx", ".csv")
+            and app.tipo_encabezado.get() == "Fila" and not app.combinar_hojas.get())
+
+def contar_en_streaming(columnas, tipo, al_terminar, permitidas=None):
+    # Lee el archivo en streaming y pasa las filas directo al conteo, sin DataFrame completo
+    filepath = app.filepath
+    formato = app.formato
+    if formato:
+        filtro = filtro_almacen() if formato == "almacen" else None
+        deduplicar = app.quitar_duplicados.get()
+
+        def tarea(reportar, cancelado):
+            registros = iterar_registros_formato(filepath, formato, reportar, cancelado, filtro, columnas)
+            if not deduplicar:
+                return contar_flujo_registros(registros, columnas, tipo, permitidas)
+            indice = nuevo_indice_duplicados()
+            conteos = contar_flujo_registros(filtrar_duplicados(registros, indice), columnas, tipo, permitidas)
+            reportar(f"✅ Registros contados{texto_duplicados(indice['removidos'])}")
+            return conteos
+
+        ejecutar_en_segundo_plano(tarea, al_terminar)
+        return
+
+    hoja = combo_hojas.get()
+    fila_ini = int(entry_fila_ini.get()) - 1
+    col_ini = int(entry_col_ini.get()) - 1
+    posiciones = posiciones_columnas(columnas, [str(c) for c in app.columnas_vista_previa], col_ini)
+
+    def tarea(reportar, cancelado):
+        filas = iterar_filas(filepath, hoja, fila_ini, posiciones, reportar, cancelado)
+        return contar_filas(filas, tipo, permitidas)
+
+    ejecutar_en_segundo_plano(tarea, al_terminar)
+
+def contar_archivo_corpus(filepath, hoja, fila_ini, col_ini, columnas, tipo, permitidas=None, descartar=None):
+    # Corre en un proceso hijo: ubica las columnas por nombre en este archivo y devuelve conteos parciales.
+    # descartar: posiciones de los registros duplicados, ya resueltas en el proceso principal
+    formato = detectar_formato(filepath)
+    if formato in FORMATOS_EN_FLUJO:
+        faltantes = [c for c in columnas if c not in CAMPOS_REGISTRO]
+        if faltantes:
+            return filepath, None, faltantes
+        registros = iterar_registros_formato(filepath, formato, lambda texto: None, threading.Event(), campos=columnas)
+        if descartar is not None and len(descartar):
+            descartar = set(descartar.tolist())
+            registros = (r for n, r in enumerate(registros) if n not in descartar)
+        return filepath, contar_flujo_registros(registros, columnas, tipo, permitidas), []
+    if formato:
+        df = LECTORES_FORMATO[formato](filepath, lambda texto: None, threading.Event())
+        faltantes = [c for c in columnas if c not in df.columns]
+        if faltantes:
+            return filepath, None, faltantes
+        if descartar is not None and len(descartar):
+            conservar = np.ones(len(df), dtype=bool)
+            conservar[descartar] = False
+            df = df[conservar].reset_index(drop=True)
+        return filepath, contar_registros(df, columnas, tipo, permitidas), []
+    if extension_datos(filepath) in EXTENSIONES_TEXTO + EXTENSIONES_ALMACEN:
+        return filepath, None, ["formato reconocido"]
+    if extension_datos(filepath) == ".xlsx":
+        with pd.ExcelFile(fuente_excel(filepath)) as libro:
+            if hoja not in libro.sheet_names:
+                hoja = libro.sheet_names[0]
+            encabezado = libro.parse(hoja, header=None, skiprows=fila_ini, nrows=1)
+    else:
+        with abrir_entrada(filepath) as (flujo, _):
+            encabezado = pd.read_csv(flujo, header=None, skiprows=fila_ini, nrows=1)
+    nombres = [str(v) for v in encabezado.iloc[0, col_ini:]]
+    faltantes = [c for c in columnas if c not in nombres]
+    if faltantes:
+        return filepath, None, faltantes
+    posiciones = posiciones_columnas(columnas, nombres, col_ini)
+    filas = iterar_filas(filepath, hoja, fila_ini, posiciones, lambda texto: None, threading.Event())
+    return filepath, contar_filas(filas, tipo, permitidas), []
+
+def claves_archivo_corpus(filepath, formato):
+    # Corre en un proceso hijo: claves de duplicado (DOI, título + año) de cada registro, en orden de archivo
+    if formato in FORMATOS_EN_FLUJO:
+        registros = iterar_registros_formato(filepath, formato, lambda texto: None, threading.Event(),
+                                             campos=["doi", "titulo", "anio"])
+        return [(clave_doi(r.get("doi")), clave_titulo(r.get("titulo"), r.get("anio"))) for r in registros]
+    return claves_duplicado_df(LECTORES_FORMATO[formato](filepath, lambda texto: None, threading.Event()))
+
+def resultados_en_pool(pool, funcion, argumentos, cancelado):
+    # Una tarea por argumento; entrega (posición, resultado) a medida que terminan
+    futuros = {pool.submit(funcion, *args): n for n, args in enumerate(argumentos)}
+    for futuro in as_completed(futuros):
+        if cancelado.is_set():
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise CargaCancelada()
+        yield futuros[futuro], futuro.result()
+
+def contar_corpus(archivos, hoja, fila_ini, col_ini, columnas, tipo, permitidas, reportar, cancelado, deduplicar=False,
+                  procesos=MAX_PROCESOS):
+    # Map: un proceso por archivo; reduce: los conteos parciales se fusionan en el orden de los archivos,
+    # no en el de llegada, para que nodos y aristas (y el layout) no dependan de qué proceso termina antes.
+    # Con deduplicar, una primera pasada en paralelo extrae las claves de cada archivo; el índice se recorre
+    # aquí en orden de archivo y cada proceso cuenta su archivo sin los registros ya vistos en otro.
+    descartes = [None] * len(archivos)
+    formatos = [detectar_formato(f) for f in archivos] if deduplicar else []
+    deduplicar = deduplicar and all(formatos) and not FORMATOS_DE_REVISTAS & set(formatos)
+    parciales = [None] * len(archivos)
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(procesos, len(archivos)), mp_context=contexto) as pool:
+        if deduplicar:
+            claves = [None] * len(archivos)
+            argumentos = list(zip(archivos, formatos))
+            for terminados, (n, resultado) in enumerate(
+                    resultados_en_pool(pool, claves_archivo_corpus, argumentos, cancelado), start=1):
+                claves[n] = resultado
+                reportar(f"⏳ Duplicados {terminados}/{len(archivos)} · '{os.path.basename(archivos[n])}'")
+            indice = nuevo_indice_duplicados()
+            descartes = [np.flatnonzero([es_duplicado_claves(indice, *c) for c in claves_archivo]).astype(np.int64)
+                         for claves_archivo in claves]
+        argumentos = [(f, hoja, fila_ini, col_ini, columnas, tipo, permitidas, d) for f, d in zip(archivos, descartes)]
+        for terminados, (n, (filepath, conteos, faltantes)) in enumerate(
+                resultados_en_pool(pool, contar_archivo_corpus, argumentos, cancelado), start=1):
+            nombre = os.path.basename(filepath)
+            if conteos is None:
+                reportar(f"⏳ Archivos {terminados}/{len(archivos)} · '{nombre}' omitido (sin {', '.join(faltantes)})")
+            else:
+                parciales[n] = conteos
+                reportar(f"⏳ Archivos {terminados}/{len(archivos)} · '{nombre}'")
+    acumulado = None
+    for conteos in parciales:
+        if conteos is not None:
+            acumulado = conteos if acumulado is None else fusionar_conteos(acumulado, conteos)
+    if acumulado is None:
+        raise ValueError("Ningún archivo del corpus contiene las columnas seleccionadas.")
+    if deduplicar:
+        reportar(f"✅ Corpus: {len(archivos)} archivos{texto_duplicados(indice['removidos'])}")
+    return acumulado
+
+def contar_fuera_de_memoria(columnas, tipo, al_terminar, permitidas=None):
+    # Corpus de varios archivos o modo streaming: se cuenta sin cargar app.df. Devuelve False si no aplica.
+    if not app.corpus and not usar_streaming():
+        return False
+    if app.evento_cancelar is not None:
+        messagebox.showwarning("Aviso", "Ya hay una carga en curso.")
+        return True
+    if app.corpus:
+        if app.tipo_encabezado.get() != "Fila":
+            messagebox.showinfo("Info", "El corpus de varios archivos solo está disponible con encabezados en fila.")
+            return True
+        archivos = list(app.corpus)
+        hoja = combo_hojas.get()
+        fila_ini = int(entry_fila_ini.get()) - 1
+        col_ini = int(entry_col_ini.get()) - 1
+        deduplicar = app.quitar_duplicados.get()
+        procesos = procesos_configurados()
+        ejecutar_en_segundo_plano(
+            lambda reportar, cancelado: contar_corpus(archivos, hoja, fila_ini, col_ini, columnas, tipo,
+                                                      permitidas, reportar, cancelado, deduplicar, procesos),
+            al_terminar)
+    else:
+        contar_en_streaming(columnas, tipo, al_terminar, permitidas)
+    return True
+
+def hash_contenido(filepath):
+    # Blake2b del contenido; se memoriza por (ruta, tamaño, mtime) para no releer archivos sin cambios
+    filepath = ruta_fisica(filepath)
+    st = os.stat(filepath)
+    firma = f"{os.path.abspath(filepath)}|{st.st_size}|{st.st_mtime_ns}"
+    ruta_indice = os.path.join(DIRECTORIO_CACHE, "hashes.json")
+    try:
+        with open(ruta_indice, encoding="utf-8") as f:
+            indice = json.load(f)
+    except (OSError, ValueError):
+        indice = {}
+    if firma not in indice:
+        h = hashlib.blake2b(digest_size=16)
+        with open(filepath, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+        indice[firma] = h.hexdigest()
+        indice = dict(list(indice.items())[-MAX_HASHES_RECORDADOS:])
+        os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+        with open(ruta_indice + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(indice, f)
+        os.replace(ruta_indice + ".tmp", ruta_indice)
+    return indice[firma]
+
+def clave_cache(filepath, *opciones):
+    # La clave depende del contenido y de las opciones de lectura, no solo de la ruta
+    base = (os.path.abspath(ruta_fisica(filepath)), miembro_zip(filepath), hash_contenido(filepath)) + opciones
+    return hashlib.blake2b(repr(base).encode("utf-8"), digest_size=16).hexdigest()
+
+def leer_cache(clave, columnas=None):
+    ruta = os.path.join(DIRECTORIO_CACHE, clave + ".feather")
+    if not os.path.exists(ruta):
+        return None
+    os.utime(ruta)  # marca de uso para el desalojo LRU
+    return feather.read_table(ruta, columns=columnas, memory_map=True).to_pandas()
+
+def preparar_para_cache(df):
+    # Arrow no admite columnas object con tipos mezclados; esas se guardan como texto
+    df = df.copy(deep=False)
+    df.columns = [str(c) for c in df.columns]
+    for c in df.columns[df.dtypes == object]:
+        if df[c].dropna().map(type).nunique() > 1:
+            df[c] = df[c].where(df[c].isna(), df[c].astype(str))
+    return df
+
+def guardar_cache(clave, df, limite_bytes):
+    os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+    ruta = os.path.join(DIRECTORIO_CACHE, clave + ".feather")
+    # Sin compresión para poder mapearlo en memoria al reabrir
+    feather.write_feather(preparar_para_cache(df), ruta + ".tmp", compression="uncompressed")
+    os.replace(ruta + ".tmp", ruta)
+    podar_cache(limite_bytes)
+
+def podar_cache(limite_bytes):
+    # Desaloja los archivos usados hace más tiempo hasta quedar bajo el límite
+    archivos = sorted((e for e in os.scandir(DIRECTORIO_CACHE) if e.name.endswith(".feather")),
+                      key=lambda e: e.stat().st_mtime)
+    total = sum(e.stat().st_size for e in archivos)
+    for e in archivos:
+        if total <= limite_bytes:
+            break
+        total -= e.stat().st_size
+        os.remove(e.path)
+
+def procesos_configurados():
+    # Se lee en el hilo de Tk; un valor inválido vuelve al máximo disponible
+    try:
+        return max(1, min(MAX_PROCESOS, int(entry_procesos.get())))
+    except ValueError:
+        return MAX_PROCESOS
+
+def configuracion_cache():
+    # Se lee en el hilo de Tk; devuelve None si la caché está desactivada
+    if feather is None or not app.usar_cache.get():
+        return None
+    try:
+        return max(0, float(entry_limite_cache.get())) * 1024 * 1024
+    except ValueError:
+        return LIMITE_CACHE_MB * 1024 * 1024
+
+def posiciones_columnas(columnas, nombres, col_ini):
+    # Traduce nombres elegidos en los combos a posiciones absolutas en el archivo
+    return [col_ini + nombres.index(c) for c in columnas]
+
+def leer_tabla(filepath, hoja, fila_ini, col_ini, columnas, nombres, reportar, cancelado):
+    # Lectura completa en modo Fila, proyectando solo las columnas pedidas
+    posiciones = posiciones_columnas(columnas, nombres, col_ini)
+    orden = sorted(range(len(posiciones)), key=lambda i: posiciones[i])
+    if hoja:
+        reportar(f"⏳ Leyendo hoja '{hoja}' ({len(posiciones)} columnas)...")
+        df = pd.read_excel(fuente_excel(filepath), sheet_name=hoja, header=fila_ini, usecols=posiciones)
+    else:
+        df = leer_csv_con_progreso(filepath, reportar, cancelado, header=None,
+                                   skiprows=fila_ini + 1, usecols=posiciones)
+    # usecols devuelve las columnas en orden de archivo
+    df.columns = [columnas[i] for i in orden]
+    return a_categorias(df)
+
+def a_categorias(df):
+    # Autores y keywords se repiten mucho: como category cada texto se guarda una vez y las filas
+    # solo llevan un código entero
+    for c in df.columns:
+        serie = df[c]
+        if pd.api.types.infer_dtype(serie, skipna=True) != "string":
+            continue
+        if serie.nunique() <= UMBRAL_CATEGORIAS * len(serie):
+            df[c] = serie.astype("category")
+    return df
+
+def asegurar_datos_completos(columnas, continuar):
+    # Segunda fase: lee el archivo completo (solo las columnas elegidas) y luego continúa
+    columnas = list(dict.fromkeys(columnas))
+    filepath = app.filepath
+    excel = es_excel(filepath)
+    combinar = excel and app.combinar_hojas.get() and len(app.hojas) > 1
+    if (app.df_completo and not combinar) or (app.columnas_cargadas is not None and set(columnas) <= app.columnas_cargadas):
+        continuar()
+        return
+    if app.evento_cancelar is not None:
+        messagebox.showwarning("Aviso", "Ya hay una carga en curso.")
+        return
+    if app.formato:
+        # Exporte abierto en streaming: se cargan todos los registros si se pide la red sin streaming
+        formato = app.formato
+        deduplicar = app.quitar_duplicados.get()
+        limite_cache = configuracion_cache()
+
+        def registros_cargados(resultado):
+            app.df, removidos = resultado
+            app.df_completo = True
+            label_estado.config(
+                text=f"✅ Exporte {NOMBRES_FORMATO[formato]}: {len(app.df):,} registros{texto_duplicados(removidos)}")
+            continuar()
+
+        ejecutar_en_segundo_plano(
+            lambda reportar, cancelado: leer_registros_formato(filepath, formato, deduplicar, reportar, cancelado,
+                                                               limite_cache),
+            registros_cargados)
+        return
+
+    fila_ini = int(entry_fila_ini.get()) - 1
+    col_ini = int(entry_col_ini.get()) - 1
+    hoja = combo_hojas.get()
+    por_fila = app.tipo_encabezado.get() == "Fila"
+
+    if combinar:
+        if not por_fila:
+            messagebox.showinfo("Info", "Combinar hojas solo está disponible con encabezados en fila.")
+            return
+        hojas = list(app.hojas)
+
+        def tarea(reportar, cancelado):
+            return leer_todas_las_hojas(filepath, hojas, fila_ini, columnas, reportar, cancelado)
+
+        def hojas_cargadas(resultado):
+            df, omitidas = resultado
+            app.df = df
+            app.columnas_cargadas = set(columnas)
+            aviso = f" · {len(omitidas)} hojas omitidas" if omitidas else ""
+            label_estado.config(text=f"✅ {len(hojas) - len(omitidas)} hojas combinadas: {len(df):,} filas{aviso}")
+            continuar()
+
+        ejecutar_en_segundo_plano(tarea, hojas_cargadas)
+        return
+
+    hoja_excel = hoja if excel else None
+    nombres = [str(c) for c in app.columnas_vista_previa]
+    limite_cache = configuracion_cache()
+
+    if por_fila:
+        def tarea(reportar, cancelado):
+            if limite_cache is None or len(set(nombres)) != len(nombres):
+                return leer_tabla(filepath, hoja_excel, fila_ini, col_ini, columnas, nombres, reportar, cancelado)
+            # Con caché se parsean todas las columnas una vez; luego se proyecta desde disco
+            reportar("⏳ Buscando en caché...")
+            clave = clave_cache(filepath, hoja_excel, fila_ini, col_ini, "Fila")
+            df = leer_cache(clave, columnas)
+            if df is not None:
+                reportar("⚡ Datos leídos desde caché")
+                return df
+            df = leer_tabla(filepath, hoja_excel, fila_ini, col_ini, nombres, nombres, reportar, cancelado)
+            try:
+                guardar_cache(clave, df, limite_cache)
+            except Exception as e:
+                reportar(f"⚠️ No se pudo guardar en caché: {e}")
+            return df[columnas]
+    else:
+        def leer_rejilla(reportar, cancelado):
+            if excel:
+                reportar(f"⏳ Leyendo hoja '{hoja}'...")
+                return pd.read_excel(fuente_excel(filepath), sheet_name=hoja, header=None)
+            return leer_csv_con_progreso(filepath, reportar, cancelado, header=None)
+
+        def tarea(reportar, cancelado):
+            if limite_cache is None:
+                return leer_rejilla(reportar, cancelado)
+            reportar("⏳ Buscando en caché...")
+            clave = clave_cache(filepath, hoja_excel, "Crudo")
+            df = leer_cache(clave)
+            if df is None:
+                df = preparar_para_cache(leer_rejilla(reportar, cancelado))
+                try:
+                    guardar_cache(clave, df, limite_cache)
+                except Exception as e:
+                    reportar(f"⚠️ No se pudo guardar en caché: {e}")
+            return df
+
+    def datos_cargados(df):
+        if por_fila:
+            app.df = df.reset_index(drop=True)
+            app.columnas_cargadas = set(columnas)
+        else:
+            if excel:
+                app.cache_hojas[(filepath, hoja)] = (df, True)
+            app.df_raw = df.iloc[fila_ini:, col_ini:]
+            app.df = app.df_raw.iloc[:, col_ini:]
+            app.df_completo = True
+        label_estado.config(text=f"✅ Datos completos: {len(df):,} filas")
+        continuar()
+
+    ejecutar_en_segundo_plano(tarea, datos_cargados)
+
 # Funciones
 def cargar_archivo():
     filepath = filedialog.askopenfilename(
-        filetypes=[("Archivos CSV", "*.csv"), ("Archivos Excel", "*.xlsx *.xls")]
+        filetypes=[("Archivos CSV", "*.csv"), ("Archivos Excel", "*.xlsx *.xls"),
+                   ("Exportes bibliográficos", "*.txt *.ris *.bib *.nbib *.jsonl *.ndjson"),
+                   ("Almacén SQLite", "*.sqlite *.db"), ("Comprimidos", "*.gz *.xz *.bz2 *.zip")]
     )
     if not filepath:
         return
+    try:
+        entradas = expandir_entradas([filepath])
+    except Exception as e:
+        label_estado.config(text=f"⚠️ Error al cargar: {str(e)}")
+        return
+    if not entradas:
+        messagebox.showwarning("Aviso", "El archivo no contiene CSV ni Excel.")
+        return
+    if len(entradas) > 1:
+        abrir_corpus(entradas)  # un .zip con varios exportes se trata como corpus
+        return
+    abrir_archivo(entradas[0])
 
+def cargar_corpus(desde_carpeta=False):
+    # Varios exportes (p. ej. por el límite de registros de Scopus) tratados como un solo corpus
+    if desde_carpeta:
+        carpeta = filedialog.askdirectory()
+        if not carpeta:
+            return
+        archivos = listar_carpeta(carpeta)
+    else:
+        archivos = list(filedialog.askopenfilenames(
+            filetypes=[("Archivos CSV/Excel", "*.csv *.xlsx"), ("Exportes bibliográficos", "*.txt *.ris *.bib *.nbib *.jsonl *.ndjson"),
+                       ("Comprimidos", "*.gz *.xz *.bz2 *.zip")]
+        ))
+    # El corpus admite CSV y XLSX (también comprimidos o dentro de .zip)
     try:
-        app.filepath = filepath
-        if filepath.endswith((".xlsx", ".xls")):
-            app.excel_file = pd.ExcelFile(filepath)
-            app.hojas = app.excel_file.sheet_names
+        archivos = [f for f in expandir_entradas(archivos) if extension_datos(f) != ".xls"]
+    except Exception as e:
+        label_estado.config(text=f"⚠️ Error al cargar: {str(e)}")
+        return
+    if not archivos:
+        return
+    abrir_corpus(archivos)
+
+def listar_carpeta(carpeta):
+    # Recorrido recursivo: los snapshots reparten sus partes en subcarpetas (updated_date=...)
+    return sorted(os.path.join(raiz, f) for raiz, _, nombres in os.walk(carpeta) for f in nombres)
+
+def detener_vigilancia():
+    # La revisión ya programada ve que la carpeta cambió y no se vuelve a programar
+    app.carpeta_vigilada = None
+    boton_vigilar.config(text="👁️ Vigilar carpeta")
+    label_estado.config(text="⏹️ Vigilancia detenida")
+
+def alternar_vigilancia():
+    # Modo vigilancia: los exportes nuevos de una carpeta se suman a la red mostrada sin recalcularla
+    if app.carpeta_vigilada:
+        detener_vigilancia()
+        return
+    if not app.filepath or app.tipo_encabezado.get() != "Fila":
+        messagebox.showinfo("Info", "Abre primero un archivo o corpus con encabezados en fila.")
+        return
+    carpeta = filedialog.askdirectory()
+    if not carpeta:
+        return
+    if app.corpus is None:
+        app.corpus = [app.filepath]  # desde ahora las redes completas incluyen los archivos nuevos
+    app.carpeta_vigilada = carpeta
+    app.archivos_vistos = set(listar_carpeta(carpeta))  # solo cuenta lo que llegue después
+    app.tamanos_pendientes = {}
+    boton_vigilar.config(text="⏹️ Dejar de vigilar")
+    label_estado.config(text=f"👁️ Vigilando {os.path.basename(carpeta)}")
+    app.after(INTERVALO_VIGILANCIA_MS, revisar_carpeta_vigilada, carpeta)
+
+def revisar_carpeta_vigilada(carpeta):
+    if app.carpeta_vigilada != carpeta:
+        return
+    try:
+        actuales = {}
+        for ruta in listar_carpeta(carpeta):
+            if ruta not in app.archivos_vistos:
+                try:
+                    actuales[ruta] = os.path.getsize(ruta)
+                except OSError:
+                    continue
+        # Un archivo se procesa cuando su tamaño no cambió entre dos revisiones (terminó de copiarse)
+        listos = [ruta for ruta, tamano in actuales.items() if app.tamanos_pendientes.get(ruta) == tamano]
+        app.tamanos_pendientes = {ruta: tamano for ruta, tamano in actuales.items() if ruta not in listos}
+        if listos and app.evento_cancelar is None:
+            app.archivos_vistos.update(listos)  # un archivo con error no se reintenta en cada revisión
+            nuevos = [f for f in expandir_entradas(listos) if extension_datos(f) != ".xls"]
+            if nuevos:
+                ingerir_archivos_nuevos(nuevos)
+    except Exception as e:
+        label_estado.config(text=f"⚠️ Error al vigilar {os.path.basename(carpeta)}: {str(e)}")
+    finally:
+        # Se reprograma siempre: un archivo con error no debe detener la vigilancia
+        app.after(INTERVALO_VIGILANCIA_MS, revisar_carpeta_vigilada, carpeta)
+
+def ingerir_archivos_nuevos(nuevos):
+    app.corpus = list(app.corpus) + nuevos
+    G = getattr(app, "grafo_keywords", None)
+    if G is None:
+        G = getattr(app, "grafo_general", None)
+    if G is None or app.red_actual is None:
+        label_estado.config(text=f"👁️ {len(nuevos)} archivos nuevos añadidos al corpus")
+        return
+    tipo, columnas, permitidas = app.red_actual
+    hoja = combo_hojas.get()
+    fila_ini = int(entry_fila_ini.get()) - 1
+    col_ini = int(entry_col_ini.get()) - 1
+
+    def tarea(reportar, cancelado):
+        # Solo se leen los archivos nuevos; son pocos y pequeños, así que van en este hilo
+        delta = None
+        omitidos = 0
+        for n, filepath in enumerate(nuevos, start=1):
+            if cancelado.is_set():
+                raise CargaCancelada()
+            reportar(f"⏳ Archivo nuevo {n}/{len(nuevos)} · '{os.path.basename(filepath)}'")
+            _, conteos, _ = contar_archivo_corpus(filepath, hoja, fila_ini, col_ini, columnas, tipo, permitidas)
+            if conteos is None:
+                omitidos += 1
+            else:
+                delta = conteos if delta is None else fusionar_conteos(delta, conteos)
+        return delta, omitidos
+
+    def delta_listo(resultado):
+        delta, omitidos = resultado
+        aviso = f" · {omitidos} omitidos" if omitidos else ""
+        vigente = G is getattr(app, "grafo_keywords" if tipo == "keywords" else "grafo_general", None)
+        if delta is not None and vigente:
+            # Los conteos de los archivos nuevos se suman sobre las aristas de la red ya construida
+            base = Conteos.desde_aristas(Aristas(G.etiquetas, *G.aristas(), np.arange(len(G))))
+            red = red_desde_conteos(fusionar_conteos(base, delta), aislados=tipo == "general")
+            actualizado = GrafoCSR.desde_aristas(red)
+            if tipo == "keywords":
+                app.lista_keywords = sorted(set(app.lista_keywords) | set(delta.etiquetas))
+                mostrar_red_keywords(actualizado)
+            else:
+                mostrar_red_general(actualizado)
+        label_estado.config(text=f"👁️ {len(nuevos)} archivos nuevos incorporados a la red{aviso}")
+
+    ejecutar_en_segundo_plano(tarea, delta_listo)
+
+def abrir_corpus(archivos):
+    # El primer archivo define columnas y opciones de encabezado para todo el corpus
+    abrir_archivo(archivos[0], archivos)
+    if app.corpus is archivos:  # no se abrió si había otra carga en curso
+        label_estado.config(text=f"✅ Corpus: {len(archivos)} archivos (columnas de {os.path.basename(archivos[0])})")
+
+def guardar_en_almacen():
+    # Vuelca el exporte o corpus abierto a un almacén SQLite para reabrirlo sin releer los originales
+    if app.corpus:
+        archivos = list(app.corpus)
+    elif app.formato and app.formato != "almacen":
+        archivos = [app.filepath]
+    else:
+        messagebox.showinfo("Info", "Abre primero un exporte bibliográfico o un corpus.")
+        return
+    if app.evento_cancelar is not None:
+        messagebox.showwarning("Aviso", "Ya hay una carga en curso.")
+        return
+    ruta = filedialog.asksaveasfilename(defaultextension=".sqlite", filetypes=[("Almacén SQLite", "*.sqlite *.db")])
+    if not ruta:
+        return
+    for sobrante in (ruta, ruta + "-wal", ruta + "-shm"):
+        if os.path.exists(sobrante):
+            os.remove(sobrante)  # el diálogo ya confirmó el reemplazo
+
+    deduplicar = app.quitar_duplicados.get()
+
+    def almacen_creado(resultado):
+        guardados, omitidos, removidos = resultado
+        aviso = f" · {len(omitidos)} archivos sin formato reconocido" if omitidos else ""
+        label_estado.config(
+            text=f"✅ Almacén: {guardados:,} registros en {os.path.basename(ruta)}{texto_duplicados(removidos)}{aviso}")
+
+    ejecutar_en_segundo_plano(
+        lambda reportar, cancelado: guardar_archivos_almacen(ruta, archivos, reportar, cancelado, deduplicar),
+        almacen_creado)
+
+def filtro_almacen():
+    # Subconjunto a consultar en el almacén; los campos vacíos no filtran
+    def anio(entry):
+        texto = entry.get().strip()
+        return int(texto) if texto.isdigit() else None
+    return {"anio_desde": anio(entry_anio_desde), "anio_hasta": anio(entry_anio_hasta),
+            "fuente": entry_fuente_almacen.get().strip()}
+
+def abrir_archivo(filepath, corpus=None):
+    if app.evento_cancelar is not None:
+        messagebox.showwarning("Aviso", "Ya hay una carga en curso.")
+        return
+
+    nombre = os.path.basename(filepath)
+    # La detección ya lee el archivo (encoding, CSV vacío, .zip corrupto): si falla, se conserva lo abierto
+    try:
+        formato = detectar_formato(filepath)
+    except Exception as e:
+        label_estado.config(text=f"⚠️ Error al cargar: {str(e)}")
+        return
+    if extension_datos(filepath) in EXTENSIONES_TEXTO + EXTENSIONES_ALMACEN and not formato:
+        label_estado.config(text=f"⚠️ Formato de texto no reconocido: {nombre}")
+        return
+
+    if app.carpeta_vigilada:
+        detener_vigilancia()  # la vigilancia sumaba archivos al conjunto de datos que se reemplaza
+    app.corpus = corpus
+    app.filepath = filepath
+    app.cache_hojas = {}  # las hojas en caché pertenecen al archivo anterior
+    app.parametros_vista_previa = None
+    app.formato = formato
+    if app.formato:
+        # Exporte bibliográfico: se lee completo con su lector y queda en el esquema normalizado
+        formato = app.formato
+        app.hojas = []
+        combo_hojas["values"] = []
+        combo_hojas.set("")
+        if formato == "almacen" or (app.modo_streaming.get() and formato in ITERADORES_FORMATO):
+            # En streaming solo se ofrecen los campos; los registros se leen al generar la red
+            app.df = pd.DataFrame(columns=CAMPOS_REGISTRO)
+            app.df_completo = False
+            cargar_columnas_desde_df()
+            if formato == "almacen":
+                label_estado.config(text=f"✅ Almacén SQLite: {contar_almacen(filepath):,} registros")
+            elif not app.corpus:
+                label_estado.config(text=f"✅ Exporte {NOMBRES_FORMATO[formato]} (streaming): {nombre}")
+            return
+
+        deduplicar = app.quitar_duplicados.get()
+        limite_cache = configuracion_cache()
+
+        def registros_cargados(resultado):
+            app.df, removidos = resultado
+            app.df_completo = True
+            cargar_columnas_desde_df()
+            if not app.corpus:
+                label_estado.config(
+                    text=f"✅ Exporte {NOMBRES_FORMATO[formato]}: {len(app.df):,} registros{texto_duplicados(removidos)}")
+
+        ejecutar_en_segundo_plano(
+            lambda reportar, cancelado: leer_registros_formato(filepath, formato, deduplicar, reportar, cancelado,
+                                                               limite_cache),
+            registros_cargados)
+    elif es_excel(filepath):
+        def excel_cargado(excel_file):
+            app.excel_file = excel_file
+            app.hojas = excel_file.sheet_names
             combo_hojas["values"] = app.hojas
             combo_hojas.set(app.hojas[0])
-            label_estado.config(text=f"✅ Excel cargado: {filepath.split('/')[-1]}")
+            if not app.corpus:
+                label_estado.config(text=f"✅ Excel cargado: {nombre}")
             cargar_columnas_excel()
-        else:
-            df = pd.read_csv(filepath, header=None)
-            app.df_raw = df
-            app.hojas = []
-            combo_hojas["values"] = []
-            combo_hojas.set("")
-            label_estado.config(text=f"✅ CSV cargado: {filepath.split('/')[-1]}")
-            cargar_columnas_desde_df_csv()
-    except Exception as e:
-        label_estado.config(text=f"⚠️ Error al cargar: {str(e)}")
+
+        ejecutar_en_segundo_plano(
+            lambda reportar, cancelado: leer_excel_con_progreso(filepath, reportar, cancelado),
+            excel_cargado)
+    else:
+        # Solo se leen las primeras filas; el resto se carga al generar la red
+        app.hojas = []
+        combo_hojas["values"] = []
+        combo_hojas.set("")
+        label_estado.config(text=f"✅ CSV cargado: {nombre}")
+        cargar_columnas_desde_df_csv()
 
 def manejar_cambio_hoja(event=None):
-    if app.filepath.endswith((".xlsx", ".xls")):  # archivo_excel es un path o workbook abierto
+    if not app.filepath or app.formato:
+        return
+    parametros = (app.filepath, combo_hojas.get(), entry_fila_ini.get(),
+                  entry_col_ini.get(), app.tipo_encabezado.get(), app.combinar_hojas.get())
+    if parametros == app.parametros_vista_previa:
+        return  # nada cambió (p. ej. FocusOut sin editar el campo)
+    app.parametros_vista_previa = parametros
+    if es_excel(app.filepath):
         cargar_columnas_excel()
     else:
         cargar_columnas_desde_df_csv()
 
-def crear_red_general(df, source_col, target_col):
-    G = nx.Graph()
-    for _, row in df.iterrows():
-        source = str(row[source_col])
-        target = str(row[target_col])
-        if G.has_edge(source, target):
-            G[source][target]["weight"] += 1
+# Formatos bibliográficos
+def es_exporte_scopus(columnas):
+    columnas = {str(c).lstrip("\ufeff").strip() for c in columnas}
+    return {"Authors", "Source title"} <= columnas and bool({"EID", "Author Keywords"} & columnas)
+
+def es_exporte_fuentes_scopus(columnas):
+    columnas = {str(c).lstrip("\ufeff").strip() for c in columnas}
+    return {"Source title", "CiteScore"} <= columnas and "Authors" not in columnas
+
+def codificacion_texto(filepath):
+    # Los exportes tabulados de WoS suelen venir en UTF-16 con BOM
+    with abrir_entrada(filepath) as (flujo, _):
+        inicio = flujo.read(4)
+    if inicio.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    return "utf-8-sig"
+
+def detectar_formato(filepath):
+    # Devuelve la clave del lector propio del formato o None para tablas genéricas
+    extension = extension_datos(filepath)
+    if extension in EXTENSIONES_ALMACEN:
+        return "almacen" if es_almacen(filepath) else None
+    if extension == ".csv":
+        with abrir_entrada(filepath) as (flujo, _):
+            encabezado = pd.read_csv(flujo, nrows=0).columns
+        if es_exporte_scopus(encabezado):
+            return "scopus"
+        if es_exporte_fuentes_scopus(encabezado):
+            return "scopus_fuentes"
+    elif extension == ".bib":
+        return "bibtex"
+    elif extension in (".ris", ".nbib", ".txt") + EXTENSIONES_JSON:
+        with abrir_entrada(filepath) as (flujo, _):
+            lineas = io.TextIOWrapper(flujo, encoding=codificacion_texto(filepath), errors="replace")
+            primera = next((l for l in lineas if l.strip()), "")
+        if primera.startswith("FN "):
+            return "wos"
+        if primera.startswith("PT\t"):
+            return "wos_tab"
+        if primera.startswith("TY  - "):
+            return "ris"
+        if primera.startswith("PMID-"):
+            return "medline"
+        if primera.lstrip().startswith("{"):
+            try:
+                obra = json_loads(primera)
+            except ValueError:
+                return None
+            if "authorships" in obra or str(obra.get("id", "")).startswith("https://openalex.org/"):
+                return "openalex"
+            if "DOI" in obra or "message" in obra:
+                return "crossref"
+    return None
+
+def leer_scopus(filepath, reportar, cancelado):
+    # Solo se leen las columnas conocidas; se renombran al esquema normalizado de registros
+    df = leer_csv_con_progreso(filepath, reportar, cancelado,
+                               usecols=lambda c: c.lstrip("\ufeff").strip() in COLUMNAS_SCOPUS)
+    df.columns = [COLUMNAS_SCOPUS[c.lstrip("\ufeff").strip()] for c in df.columns]
+    return a_categorias(enteros_con_huecos(df))
+
+def nombre_fuentes_scopus(columna):
+    columna = columna.lstrip("\ufeff").strip()
+    if columna in COLUMNAS_FUENTES_SCOPUS:
+        return COLUMNAS_FUENTES_SCOPUS[columna]
+    if columna == "Keywords":
+        return "rango_citescore"
+    return next((nombre for sufijo, nombre in SUFIJOS_FUENTES_SCOPUS.items() if columna.endswith(sufijo)), None)
+
+def leer_fuentes_scopus(filepath, reportar, cancelado):
+    # La celda multilínea se separa con un único str.extract vectorizado en columnas numéricas y el área
+    df = leer_csv_con_progreso(filepath, reportar, cancelado, usecols=lambda c: nombre_fuentes_scopus(c) is not None)
+    df.columns = [nombre_fuentes_scopus(c) for c in df.columns]
+    if "rango_citescore" in df.columns:
+        partes = df.pop("rango_citescore").astype("string").str.extract(PATRON_RANGO_CITESCORE)
+        df["percentil"] = pd.to_numeric(partes["percentil"])
+        df["rango"] = pd.to_numeric(partes["rango"]).astype("Int64")
+        df["tamano_categoria"] = pd.to_numeric(partes["tamano_categoria"]).astype("Int64")
+        df["area"] = partes["area"].replace("", pd.NA)
+    return a_categorias(df)
+
+def iterar_registros_wos(lineas):
+    # Parser de texto plano de WoS línea por línea: cada registro termina en "ER"
+    # y las líneas de continuación empiezan con tres espacios
+    registro = {}
+    etiqueta = None
+    for linea in lineas:
+        if linea.startswith("   "):
+            if etiqueta is not None:
+                registro[etiqueta].append(linea[3:].rstrip())
+            continue
+        actual = linea[:2]
+        if actual == "ER":
+            yield normalizar_registro_wos(registro)
+            registro = {}
+            etiqueta = None
+        elif actual in ETIQUETAS_WOS:
+            etiqueta = actual
+            registro[etiqueta] = [linea[3:].rstrip()]
         else:
-            G.add_edge(source, target, weight=1)
-    return G
-
-def crear_red_palabras_clave(df, keywords_col):
-    G = nx.Graph()
-    keywords_unicas = set()
-    for _, row in df.iterrows():
-        try:
-            raw_text = str(row[keywords_col])
-            if ";" in raw_text:
-                keywords = raw_text.split(";")
-            elif "," in raw_text:
-                keywords = raw_text.split(",")
-            elif "." in raw_text:
-                keywords = raw_text.split(".")
-            else:
-                keywords = [raw_text]
-
-            keywords = [k.strip() for k in keywords if k.strip()]
-            keywords_unicas.update(keywords)
-
-            for i in range(len(keywords)):
-                for j in range(i + 1, len(keywords)):
-                    k1, k2 = keywords[i], keywords[j]
-                    if G.has_edge(k1, k2):
-                        G[k1][k2]["weight"] += 1
-                    else:
-                        G.add_edge(k1, k2, weight=1)
-        except:
+            etiqueta = None
+
+def normalizar_registro_wos(registro):
+    normalizado = {}
+    for etiqueta, lineas in registro.items():
+        if etiqueta in ETIQUETAS_UN_VALOR_POR_LINEA:
+            valor = [l for l in lineas if l]
+        elif etiqueta in ("DE", "ID"):
+            valor = [k.strip() for k in " ".join(lineas).split(";") if k.strip()]
+        elif etiqueta in ETIQUETAS_NUMERICAS:
+            valor = int(lineas[0]) if lineas[0].isdigit() else None
+        else:
+            valor = " ".join(lineas)
+        normalizado[ETIQUETAS_WOS[etiqueta]] = valor
+    return normalizado
+
+def anio_en_texto(texto):
+    encontrado = re.search(r"\d{4}", texto)
+    return int(encontrado.group()) if encontrado else None
+
+def iterar_registros_ris(lineas):
+    # RIS: "TY  - " abre el registro y "ER  - " lo cierra; las etiquetas repetidas acumulan valores
+    registro = {}
+    for linea in lineas:
+        linea = linea.rstrip()
+        if linea[2:6] != "  - " and linea[2:] != "  -":
             continue
+        etiqueta, valor = linea[:2], linea[6:].strip()
+        if etiqueta == "ER":
+            yield registro
+            registro = {}
+            continue
+        campo = ETIQUETAS_RIS.get(etiqueta)
+        if campo is None or not valor:
+            continue
+        if campo in CAMPOS_MULTIVALOR:
+            registro.setdefault(campo, []).append(valor)
+        elif campo == "anio":
+            registro.setdefault(campo, anio_en_texto(valor))
+        else:
+            registro.setdefault(campo, valor)
+
+def iterar_registros_medline(lineas):
+    # MEDLINE: etiqueta de 4 caracteres + "- ", continuación con 6 espacios y registros separados por línea vacía
+    registro = {}
+    campo = None
+    for linea in lineas:
+        linea = linea.rstrip()
+        if not linea:
+            if registro:
+                yield registro
+            registro = {}
+            campo = None
+            continue
+        if linea.startswith("      "):
+            if campo is not None and campo not in CAMPOS_MULTIVALOR:
+                registro[campo] += " " + linea.strip()
+            elif campo is not None:
+                registro[campo][-1] += " " + linea.strip()
+            continue
+        etiqueta, valor = linea[:4].strip(), linea[6:].strip()
+        if etiqueta in ("LID", "AID") and valor.endswith("[doi]"):
+            campo = None
+            registro.setdefault("doi", valor[:-5].strip())
+            continue
+        campo = ETIQUETAS_MEDLINE.get(etiqueta)
+        if campo is None:
+            continue
+        if campo in CAMPOS_MULTIVALOR:
+            registro.setdefault(campo, []).append(valor)
+        elif campo == "anio":
+            registro.setdefault(campo, anio_en_texto(valor))
+            campo = None
+        elif campo in registro:
+            campo = None
+        else:
+            registro[campo] = valor
+    if registro:
+        yield registro
+
+def valor_bibtex(texto, inicio):
+    # Lee un valor {…}, "…" o desnudo desde `inicio`; devuelve (valor, posición siguiente)
+    if texto[inicio] in "{\"":
+        cierre = "}" if texto[inicio] == "{" else "\""
+        nivel = 0
+        for pos in range(inicio + 1, len(texto)):
+            c = texto[pos]
+            if c == cierre and nivel == 0:
+                return texto[inicio + 1:pos], pos + 1
+            if c == "{":
+                nivel += 1
+            elif c == "}":
+                nivel -= 1
+        return texto[inicio + 1:], len(texto)
+    fin = texto.find(",", inicio)
+    fin = len(texto) if fin == -1 else fin
+    return texto[inicio:fin].strip(), fin
+
+def registro_bibtex(entrada):
+    # entrada: "@tipo{clave, campo = {valor}, ...}" completa
+    tipo, _, cuerpo = entrada.partition("{")
+    if tipo.strip().lower() in ("@comment", "@string", "@preamble"):
+        return None
+    clave, _, cuerpo = cuerpo.rstrip().rstrip("}").partition(",")
+    registro = {"id": clave.strip()}
+    pos = 0
+    while True:
+        encontrado = PATRON_CAMPO_BIBTEX.match(cuerpo, pos)
+        if encontrado is None:
+            break
+        valor, pos = valor_bibtex(cuerpo, encontrado.end())
+        campo = CAMPOS_BIBTEX.get(encontrado.group(1).lower())
+        if campo is None or campo in registro:
+            continue
+        valor = " ".join(valor.replace("{", "").replace("}", "").split())
+        if campo == "autores":
+            registro[campo] = [a.strip() for a in re.split(r"\s+and\s+", valor) if a.strip()]
+        elif campo == "keywords_autor":
+            separador = ";" if ";" in valor else ","
+            registro[campo] = [k.strip() for k in valor.split(separador) if k.strip()]
+        elif campo == "anio":
+            registro[campo] = anio_en_texto(valor)
+        else:
+            registro[campo] = valor
+    return registro
+
+def iterar_registros_bibtex(lineas):
+    # Acumula las líneas de una entrada hasta que sus llaves se equilibran y la entrega
+    entrada = []
+    nivel = 0
+    for linea in lineas:
+        if not entrada and not linea.lstrip().startswith("@"):
+            continue
+        entrada.append(linea)
+        nivel += linea.count("{") - linea.count("}")
+        if nivel <= 0 and "{" in "".join(entrada):
+            registro = registro_bibtex("".join(entrada).strip())
+            entrada = []
+            nivel = 0
+            if registro is not None:
+                yield registro
+
+def nombres_no_vacios(valores):
+    valores = [v for v in valores if v]
+    return valores or None
+
+def registro_openalex(obra):
+    # Proyección de un "work" de OpenAlex: el resto del objeto se descarta en cuanto se normaliza
+    fuente = ((obra.get("primary_location") or {}).get("source") or {}).get("display_name")
+    return {
+        "autores": nombres_no_vacios((a.get("author") or {}).get("display_name") for a in obra.get("authorships") or []),
+        "keywords_autor": nombres_no_vacios(k.get("display_name") for k in obra.get("keywords") or []),
+        "keywords_indice": nombres_no_vacios(c.get("display_name") for c in obra.get("concepts") or []),
+        "referencias": nombres_no_vacios(obra.get("referenced_works") or []),
+        "anio": obra.get("publication_year"),
+        "fuente": fuente,
+        "citas": obra.get("cited_by_count"),
+        "titulo": obra.get("display_name") or obra.get("title"),
+        "doi": obra.get("doi"),
+        "id": obra.get("id"),
+    }
+
+def registro_crossref(obra):
+    # Ítems de Crossref, sueltos o envueltos en {"message": {...}} como los devuelve la API
+    if isinstance(obra.get("message"), dict):
+        obra = obra["message"]
+    autores = (", ".join(p for p in (a.get("family"), a.get("given")) if p) or a.get("name")
+               for a in obra.get("author") or [])
+    fecha = ((obra.get("issued") or {}).get("date-parts") or [[None]])[0] or [None]
+    return {
+        "autores": nombres_no_vacios(autores),
+        "keywords_autor": nombres_no_vacios(obra.get("subject") or []),
+        "keywords_indice": None,
+        "referencias": nombres_no_vacios(r.get("DOI") or r.get("unstructured") for r in obra.get("reference") or []),
+        "anio": fecha[0],
+        "fuente": next(iter(obra.get("container-title") or []), None),
+        "citas": obra.get("is-referenced-by-count"),
+        "titulo": next(iter(obra.get("title") or []), None),
+        "doi": obra.get("DOI"),
+        "id": obra.get("DOI"),
+    }
+
+def iterar_registros_openalex(lineas):
+    for linea in lineas:
+        if linea.strip():
+            yield registro_openalex(json_loads(linea))
+
+def iterar_registros_crossref(lineas):
+    for linea in lineas:
+        if linea.strip():
+            yield registro_crossref(json_loads(linea))
+
+ITERADORES_FORMATO = {
+    "wos": iterar_registros_wos,
+    "ris": iterar_registros_ris,
+    "bibtex": iterar_registros_bibtex,
+    "medline": iterar_registros_medline,
+    "openalex": iterar_registros_openalex,
+    "crossref": iterar_registros_crossref,
+}
+
+FORMATOS_EN_FLUJO = set(ITERADORES_FORMATO) | {"almacen"}
+
+def iterar_registros_formato(filepath, formato, reportar, cancelado, filtro=None, campos=None):
+    if formato == "almacen":
+        return iterar_registros_almacen(filepath, filtro, reportar, cancelado, campos)
+    return iterar_registros_archivo(filepath, formato, reportar, cancelado)
+
+def iterar_registros_archivo(filepath, formato, reportar, cancelado):
+    # Registros normalizados uno a uno: la memoria no depende del tamaño del archivo
+    total = os.path.getsize(ruta_fisica(filepath)) or 1
+    with abrir_entrada(filepath) as (flujo, fisico):
+        lineas = io.TextIOWrapper(flujo, encoding=codificacion_texto(filepath), errors="replace")
+        for n, registro in enumerate(ITERADORES_FORMATO[formato](lineas), start=1):
+            yield registro
+            if n % REGISTROS_POR_REPORTE == 0:
+                if cancelado.is_set():
+                    raise CargaCancelada()
+                avance = min(100, fisico.tell() * 100 // total)
+                reportar(f"⏳ Leyendo {NOMBRES_FORMATO[formato]}: {avance}% ({n:,} registros)")
+
+def enteros_con_huecos(df):
+    # Año y citas como Int64: con una celda vacía la columna no pasa a float y 2020 no es el nodo "2020.0"
+    for campo in ("anio", "citas"):
+        if campo in df.columns:
+            df[campo] = pd.to_numeric(df[campo], errors="coerce").astype("Int64")
+    return df
+
+def registros_a_df(registros):
+    return enteros_con_huecos(pd.DataFrame.from_records(registros, columns=CAMPOS_REGISTRO))
+
+def lector_registros(formato):
+    def leer(filepath, reportar, cancelado):
+        return a_categorias(registros_a_df(iterar_registros_archivo(filepath, formato, reportar, cancelado)))
+    return leer
+
+def leer_wos_tabulado(filepath, reportar, cancelado):
+    df = leer_csv_con_progreso(filepath, reportar, cancelado, sep="\t", quoting=csv.QUOTE_NONE,
+                               index_col=False, encoding=codificacion_texto(filepath),
+                               usecols=lambda c: c.strip() in ETIQUETAS_WOS)
+    df.columns = [ETIQUETAS_WOS[c.strip()] for c in df.columns]
+    return a_categorias(enteros_con_huecos(df))
+
+# Duplicados entre exportes: índice hash por DOI y por título normalizado + año
+def clave_doi(doi):
+    if doi is None or pd.isna(doi):
+        return None
+    return PATRON_PREFIJO_DOI.sub("", str(doi).strip().lower()) or None
+
+def clave_titulo(titulo, anio):
+    if titulo is None or pd.isna(titulo):
+        return None
+    texto = " ".join(re.sub(r"[\W_]+", " ", str(titulo).lower()).split())
+    if not texto:
+        return None
+    return f"{texto}|{'' if anio is None or pd.isna(anio) else int(anio)}"
+
+def nuevo_indice_duplicados():
+    # Los títulos se guardan aparte según el registro tuviera DOI o no
+    return {"doi": set(), "titulo_con_doi": set(), "titulo_sin_doi": set(), "removidos": 0}
+
+def es_duplicado(indice, doi, titulo, anio):
+    return es_duplicado_claves(indice, clave_doi(doi), clave_titulo(titulo, anio))
+
+def es_duplicado_claves(indice, doi, titulo):
+    # O(1) por registro: coincide el DOI o, si a alguno de los dos registros le falta el DOI, título + año.
+    # Dos DOI distintos nunca se fusionan por título ("Editorial", "Preface", ...). Solo se indexan las
+    # claves de los registros conservados: uno eliminado no puede arrastrar a otro por sus propias claves.
+    if doi is not None:
+        duplicado = doi in indice["doi"] or (titulo is not None and titulo in indice["titulo_sin_doi"])
+    else:
+        duplicado = titulo is not None and (titulo in indice["titulo_con_doi"] or titulo in indice["titulo_sin_doi"])
+    if duplicado:
+        indice["removidos"] += 1
+        return True
+    if doi is not None:
+        indice["doi"].add(doi)
+    if titulo is not None:
+        indice["titulo_con_doi" if doi is not None else "titulo_sin_doi"].add(titulo)
+    return False
+
+def filtrar_duplicados(registros, indice):
+    for registro in registros:
+        if not es_duplicado(indice, registro.get("doi"), registro.get("titulo"), registro.get("anio")):
+            yield registro
+
+def claves_duplicado_df(df):
+    vacia = [None] * len(df)
+    doi, titulo, anio = (df[c].tolist() if c in df.columns else vacia for c in ("doi", "titulo", "anio"))
+    return [(clave_doi(d), clave_titulo(t, a)) for d, t, a in zip(doi, titulo, anio)]
+
+def quitar_duplicados_df(df, indice):
+    conservar = [not es_duplicado_claves(indice, *claves) for claves in claves_duplicado_df(df)]
+    return df[np.array(conservar, dtype=bool)].reset_index(drop=True)
+
+def leer_formato_con_cache(filepath, formato, limite_cache, reportar, cancelado):
+    # El exporte normalizado (antes de quitar duplicados) se guarda en la caché Feather, igual que las tablas
+    if limite_cache is None or formato == "almacen":
+        return LECTORES_FORMATO[formato](filepath, reportar, cancelado)
+    reportar("⏳ Buscando en caché...")
+    clave = clave_cache(filepath, "Formato", formato)
+    df = leer_cache(clave)
+    if df is not None:
+        reportar("⚡ Datos leídos desde caché")
+        for campo in CAMPOS_MULTIVALOR & set(df.columns):
+            # Arrow devuelve las listas como arreglos de NumPy
+            if df[campo].dtype == object:
+                df[campo] = [v.tolist() if isinstance(v, np.ndarray) else v for v in df[campo]]
+        return df
+    df = LECTORES_FORMATO[formato](filepath, reportar, cancelado)
+    try:
+        guardar_cache(clave, df, limite_cache)
+    except Exception as e:
+        reportar(f"⚠️ No se pudo guardar en caché: {e}")
+    return df
+
+def leer_registros_formato(filepath, formato, deduplicar, reportar, cancelado, limite_cache=None):
+    # Lectura completa de un exporte; devuelve (df, duplicados eliminados)
+    df = leer_formato_con_cache(filepath, formato, limite_cache, reportar, cancelado)
+    if not deduplicar:
+        return df, 0
+    indice = nuevo_indice_duplicados()
+    return quitar_duplicados_df(df, indice), indice["removidos"]
+
+def texto_duplicados(removidos):
+    return f" · {removidos:,} duplicados eliminados" if removidos else ""
+
+# Almacén SQLite
+def es_almacen(filepath):
+    if extension_datos(filepath) not in EXTENSIONES_ALMACEN or SEPARADOR_ZIP in filepath:
+        return False
+    with open(filepath, "rb") as f:
+        return f.read(16) == b"SQLite format 3\x00"
+
+def abrir_almacen(ruta):
+    conexion = sqlite3.connect(ruta)
+    conexion.executescript(ESQUEMA_ALMACEN)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    return conexion
+
+def guardar_df_almacen(conexion, df):
+    # Inserta un lote de registros normalizados; devuelve cuántos se escribieron
+    inicio = conexion.execute("SELECT COALESCE(MAX(doc), -1) + 1 FROM registros").fetchone()[0]
+    df = df.reset_index(drop=True)
+    escalares = df.reindex(columns=CAMPOS_ESCALARES).astype(object)
+    escalares = escalares.where(escalares.notna(), None)
+    conexion.executemany(
+        f"INSERT INTO registros (doc, {', '.join(CAMPOS_ESCALARES)}) VALUES ({', '.join('?' * (len(CAMPOS_ESCALARES) + 1))})",
+        ((inicio + n, *fila) for n, fila in enumerate(escalares.itertuples(index=False, name=None))))
+    for campo in CAMPOS_MULTIVALOR & set(df.columns):
+        larga = explotar_campo(df[campo])
+        posiciones = larga.groupby("documento", sort=False).cumcount()
+        conexion.executemany(
+            "INSERT INTO valores (doc, campo, pos, valor) VALUES (?, ?, ?, ?)",
+            zip((larga["documento"] + inicio).tolist(), [campo] * len(larga), posiciones.tolist(), larga["valor"].tolist()))
+    conexion.commit()
+    return len(df)
+
+def guardar_archivos_almacen(ruta, archivos, reportar, cancelado, deduplicar=False):
+    # Ingesta por lotes: los formatos de texto se consumen como generador, sin cargar el archivo entero.
+    # Con deduplicar, un único índice de claves recorre todos los archivos.
+    guardados = 0
+    omitidos = []
+    indice = nuevo_indice_duplicados()
+    conexion = abrir_almacen(ruta)
+    try:
+        for filepath in archivos:
+            formato = detectar_formato(filepath)
+            nombre = os.path.basename(filepath)
+            if formato in ITERADORES_FORMATO:
+                registros = iterar_registros_archivo(filepath, formato, reportar, cancelado)
+                if deduplicar:
+                    registros = filtrar_duplicados(registros, indice)
+                while True:
+                    lote = list(islice(registros, LOTE_ALMACEN))
+                    if not lote:
+                        break
+                    guardados += guardar_df_almacen(conexion, registros_a_df(lote))
+                    reportar(f"⏳ Almacén: {guardados:,} registros · '{nombre}'")
+            elif formato in LECTORES_FORMATO and formato not in FORMATOS_DE_REVISTAS | {"almacen"}:
+                df = LECTORES_FORMATO[formato](filepath, reportar, cancelado)
+                if deduplicar:
+                    df = quitar_duplicados_df(df, indice)
+                for inicio in range(0, len(df), LOTE_ALMACEN):
+                    if cancelado.is_set():
+                        raise CargaCancelada()
+                    guardados += guardar_df_almacen(conexion, df.iloc[inicio:inicio + LOTE_ALMACEN])
+                    reportar(f"⏳ Almacén: {guardados:,} registros · '{nombre}'")
+            else:
+                omitidos.append(filepath)
+    finally:
+        conexion.close()
+    return guardados, omitidos, indice["removidos"]
+
+def condiciones_almacen(filtro):
+    # filtro: {"anio_desde": int, "anio_hasta": int, "fuente": str}; las claves ausentes no filtran
+    condiciones = []
+    parametros = []
+    filtro = filtro or {}
+    if filtro.get("anio_desde") is not None:
+        condiciones.append("anio >= ?")
+        parametros.append(filtro["anio_desde"])
+    if filtro.get("anio_hasta") is not None:
+        condiciones.append("anio <= ?")
+        parametros.append(filtro["anio_hasta"])
+    if filtro.get("fuente"):
+        condiciones.append("fuente = ?")
+        parametros.append(filtro["fuente"])
+    return condiciones, parametros
+
+def contar_almacen(ruta, filtro=None):
+    condiciones, parametros = condiciones_almacen(filtro)
+    donde = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    with closing(sqlite3.connect(ruta)) as conexion:
+        return conexion.execute(f"SELECT COUNT(*) FROM registros{donde}", parametros).fetchone()[0]
+
+def iterar_registros_almacen(ruta, filtro, reportar, cancelado, campos=None):
+    # Lee el almacén por bloques de doc: registros del bloque y luego sus valores multivalor
+    condiciones, parametros = condiciones_almacen(filtro)
+    donde = "".join(f" AND {c}" for c in condiciones)
+    multivalor = [c for c in (campos or CAMPOS_REGISTRO) if c in CAMPOS_MULTIVALOR]
+    total = contar_almacen(ruta, filtro)
+    leidos = 0
+    ultimo = -1
+    with closing(sqlite3.connect(ruta)) as conexion:
+        while True:
+            filas = conexion.execute(
+                f"SELECT doc, {', '.join(CAMPOS_ESCALARES)} FROM registros WHERE doc > ?{donde} ORDER BY doc LIMIT ?",
+                [ultimo, *parametros, LOTE_ALMACEN]).fetchall()
+            if not filas:
+                break
+            registros = {fila[0]: dict(zip(CAMPOS_ESCALARES, fila[1:])) for fila in filas}
+            if multivalor:
+                consulta = (f"SELECT doc, campo, valor FROM valores WHERE doc BETWEEN ? AND ? "
+                            f"AND campo IN ({', '.join('?' * len(multivalor))}) ORDER BY doc, campo, pos")
+                for doc, campo, valor in conexion.execute(consulta, [filas[0][0], filas[-1][0], *multivalor]):
+                    registro = registros.get(doc)
+                    if registro is not None:
+                        registro.setdefault(campo, []).append(valor)
+            yield from registros.values()
+            ultimo = filas[-1][0]
+            leidos += len(filas)
+            if cancelado.is_set():
+                raise CargaCancelada()
+            reportar(f"⏳ Almacén: {leidos:,}/{total:,} registros")
+
+def leer_almacen(filepath, reportar, cancelado):
+    return a_categorias(registros_a_df(iterar_registros_almacen(filepath, None, reportar, cancelado)))
+
+LECTORES_FORMATO = {"almacen": leer_almacen, "scopus": leer_scopus, "scopus_fuentes": leer_fuentes_scopus,
+                    "wos_tab": leer_wos_tabulado}
+LECTORES_FORMATO.update({formato: lector_registros(formato) for formato in ITERADORES_FORMATO})
+
+def explotar_campo(serie):
+    # Tabla larga (documento, valor) a partir de un campo multivalor "a; b; c" o de listas. Los lectores
+    # de formato siempre separan con ";": los nombres ("Doe, A") y las referencias llevan comas.
+    serie = serie.dropna()
+    if len(serie) and not isinstance(serie.iloc[0], list):
+        serie = serie.astype(str).str.split(";")
+    larga = serie.explode().dropna().astype(str).str.strip()
+    larga = larga[larga != ""]
+    return pd.DataFrame({"documento": larga.index, "valor": larga.to_numpy()})
+
+def tabla_larga(df, campo):
+    if campo in CAMPOS_MULTIVALOR:
+        return explotar_campo(df[campo])
+    serie = df[campo].dropna()
+    return pd.DataFrame({"documento": serie.index, "valor": serie.to_numpy()})
+
+def incidencia_larga(larga, permitidas=None):
+    # Matriz documento×valor en CSR a partir de la tabla larga; las repeticiones dentro de un documento
+    # se suman, igual que en matriz_incidencia
+    if permitidas is not None:
+        larga = larga[larga["valor"].isin(permitidas)]
+    documentos, _ = pd.factorize(larga["documento"])
+    codigos, vocabulario = pd.factorize(larga["valor"])
+    X = sparse.csr_matrix((np.ones(len(codigos), dtype=np.int64), (documentos, codigos)),
+                          shape=(documentos.max() + 1 if len(documentos) else 0, len(vocabulario)))
+    return X, vocabulario.tolist()
+
+def red_coocurrencia_larga(larga, permitidas=None, procesos=1):
+    # Red de keywords / co-autoría / co-citación de registros normalizados con el motor XᵀX
+    X, vocabulario = incidencia_larga(larga, permitidas)
+    return red_incidencia(X, vocabulario, procesos=procesos), vocabulario
+
+def conteos_coocurrencia_larga(larga, permitidas=None):
+    # Conteos para reducir entre archivos; con scipy salen de XᵀX, sin scipy de los pares de cada documento
+    if sparse is not None:
+        return Conteos.desde_aristas(red_coocurrencia_larga(larga, permitidas)[0])
+    if permitidas is not None:
+        larga = larga[larga["valor"].isin(permitidas)]
+    codigos, vocabulario = pd.factorize(larga["valor"])
+    conteos = Conteos()
+    conteos.ids(vocabulario.tolist())
+    conteos.sumar_grupos(codigos, larga.groupby("documento", sort=False).size().to_numpy())
+    return conteos
+
+def conteos_bipartitos(larga_a, larga_b):
+    # Red general entre dos campos: cada valor de uno se une con cada valor del otro en el mismo documento
+    codigos, vocabulario = pd.factorize(pd.concat([larga_a["valor"], larga_b["valor"]], ignore_index=True))
+    cruce = pd.DataFrame({"documento": larga_a["documento"].to_numpy(), "a": codigos[:len(larga_a)]}).merge(
+        pd.DataFrame({"documento": larga_b["documento"].to_numpy(), "b": codigos[len(larga_a):]}), on="documento")
+    conteos = Conteos()
+    conteos.ids(vocabulario.tolist())
+    conteos.sumar_pares(cruce["a"].to_numpy(), cruce["b"].to_numpy())
+    return conteos
+
+def contar_registros(df, columnas, tipo, permitidas=None):
+    # Conteos sobre registros normalizados (cualquier lector de formato)
+    if tipo == "general":
+        origen, destino = columnas
+        if {origen, destino} & CAMPOS_MULTIVALOR:
+            return conteos_bipartitos(tabla_larga(df, origen), tabla_larga(df, destino))
+        return Conteos.desde_aristas(red_general_series(df[origen], df[destino]))
+    campo = columnas[0]
+    if campo in CAMPOS_MULTIVALOR:
+        return conteos_coocurrencia_larga(tabla_larga(df, campo), permitidas)
+    return contar_coocurrencias((None if pd.isna(v) else v for v in df[campo]), permitidas)
+
+def valores_registro(registro, campo):
+    valor = registro.get(campo)
+    if valor is None:
+        return []
+    return valor if isinstance(valor, list) else [valor]
+
+def contar_flujo_registros(registros, columnas, tipo, permitidas=None):
+    # Mismos conteos que contar_registros, pero consumiendo un generador de registros uno a uno
+    if tipo == "general":
+        origen, destino = columnas
+        return contar_bipartito((valores_registro(r, origen), valores_registro(r, destino)) for r in registros)
+    campo = columnas[0]
+    return contar_coocurrencias((registro.get(campo) for registro in registros), permitidas)
+
+def codigos_compartidos(*series):
+    # Lleva varias columnas a un vocabulario común de enteros (-1 = celda vacía)
+    try:
+        categoricas = [s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category") for s in series]
+        union = union_categoricals(categoricas, ignore_order=True)
+        codigos, vocabulario = union.codes, union.categories
+    except TypeError:
+        # Categorías de tipos distintos (p. ej. números y texto): se factoriza todo junto
+        codigos, vocabulario = pd.factorize(pd.concat([s.astype(object) for s in series], ignore_index=True))
+    cortes = np.cumsum([len(s) for s in series])[:-1]
+    return np.split(np.asarray(codigos), cortes), vocabulario.tolist()
+
+def fusionar_claves(a, b):
+    # Reduce de dos conteos parciales (claves únicas, pesos): se suman los pesos de cada clave
+    claves = np.concatenate([a[0], b[0]])
+    if not len(claves):
+        return a
+    orden = np.argsort(claves, kind="stable")
+    claves = claves[orden]
+    inicios = np.flatnonzero(np.concatenate([[True], claves[1:] != claves[:-1]]))
+    pesos = np.add.reduceat(np.concatenate([a[1], b[1]])[orden], inicios)
+    return claves[inicios], pesos
+
+def rangos(largos):
+    # 0..largo-1 de cada tramo, concatenados
+    return np.arange(largos.sum()) - np.repeat(np.cumsum(largos) - largos, largos)
+
+def pares_en_grupos(largos):
+    # Posiciones (i, j), i < j, de todos los pares dentro de cada grupo consecutivo de un arreglo plano
+    largos = np.asarray(largos, dtype=np.int64)
+    posiciones = np.arange(largos.sum())
+    siguientes = np.repeat(np.cumsum(largos), largos) - posiciones - 1  # elementos que le siguen en su grupo
+    i = np.repeat(posiciones, siguientes)
+    return i, i + 1 + rangos(siguientes)
+
+def pares_entre_grupos(largos_a, largos_b):
+    # Posiciones (i, j) de cada elemento del grupo k de A con cada elemento del grupo k de B
+    largos_a = np.asarray(largos_a, dtype=np.int64)
+    largos_b = np.asarray(largos_b, dtype=np.int64)
+    por_elemento = np.repeat(largos_b, largos_a)
+    i = np.repeat(np.arange(len(por_elemento)), por_elemento)
+    j = np.repeat(np.repeat(np.cumsum(largos_b) - largos_b, largos_a), por_elemento) + rangos(por_elemento)
+    return i, j
+
+class Conteos:
+    # Conteos parciales (streaming, corpus, vigilancia) sobre ids enteros: cada etiqueta se interna una sola
+    # vez al leerla y los pares viajan como claves int64 con su peso. Los bloques agregados se apilan y se
+    # fusionan con fusionar_claves cuando el de abajo no es más grande, como un contador binario.
+    def __init__(self):
+        self.etiquetas = {}  # etiqueta -> id, en orden de aparición
+        self.partes = []  # (claves únicas ordenadas, pesos), de mayor a menor
+
+    @classmethod
+    def desde_aristas(cls, aristas):
+        # Red ya agregada (XᵀX, red mostrada): se internan sus nodos (todo el vocabulario si no los declara)
+        conteos = cls()
+        nodos = np.arange(len(aristas.etiquetas)) if aristas.nodos is None else np.asarray(aristas.nodos)
+        ids = np.zeros(len(aristas.etiquetas), dtype=np.int64)
+        ids[nodos] = conteos.ids(aristas.etiquetas[nodos].tolist())
+        conteos.sumar_pares(ids[aristas.origen], ids[aristas.destino], aristas.pesos)
+        return conteos
+
+    def ids(self, etiquetas):
+        return [self.etiquetas.setdefault(e, len(self.etiquetas)) for e in etiquetas]
+
+    def sumar_pares(self, origen, destino, pesos=None):
+        origen = np.asarray(origen, dtype=np.int64)
+        destino = np.asarray(destino, dtype=np.int64)
+        if not len(origen):
+            return
+        claves = np.minimum(origen, destino) * BASE_CLAVE + np.maximum(origen, destino)
+        if pesos is None:
+            claves, pesos = np.unique(claves, return_counts=True)
+        else:
+            claves, inversa = np.unique(claves, return_inverse=True)
+            pesos = np.bincount(inversa, weights=pesos, minlength=len(claves)).astype(np.int64)
+        parte = (claves, pesos.astype(np.int64))
+        while self.partes and len(self.partes[-1][0]) <= len(parte[0]):
+            parte = fusionar_claves(self.partes.pop(), parte)
+        self.partes.append(parte)
+
+    def sumar_grupos(self, ids, largos):
+        # Cada registro es un grupo consecutivo de ids: todos sus pares i < j
+        i, j = pares_en_grupos(largos)
+        ids = np.asarray(ids, dtype=np.int64)
+        self.sumar_pares(ids[i], ids[j])
+
+    def sumar_cruzados(self, ids_a, largos_a, ids_b, largos_b):
+        # Cada valor de A con cada valor de B del mismo registro
+        i, j = pares_entre_grupos(largos_a, largos_b)
+        self.sumar_pares(np.asarray(ids_a, dtype=np.int64)[i], np.asarray(ids_b, dtype=np.int64)[j])
+
+    def pares(self):
+        while len(self.partes) > 1:
+            self.partes.append(fusionar_claves(self.partes.pop(), self.partes.pop()))
+        if not self.partes:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return self.partes[0]
+
+class Aristas:
+    # Red como arreglos paralelos (origen, destino, peso) de ids enteros sobre un vocabulario, tal como
+    # sale de los conteos; para mostrarla se compacta en un GrafoCSR
+    def __init__(self, etiquetas, origen, destino, pesos, nodos=None):
+        self.etiquetas = etiquetas  # arreglo de objetos: id -> etiqueta
+        self.origen = origen
+        self.destino = destino
+        self.pesos = pesos
+        self.nodos = nodos  # ids en orden de aparición, aislados incluidos; None = solo los de las aristas
+
+class GrafoCSR:
+    # Grafo no dirigido compacto: vecinos de cada nodo en CSR (indptr, indices, pesos; cada arista en las
+    # dos filas y los lazos una sola vez) y una etiqueta por id. Dibujo, tamaños, filtro y layout trabajan
+    # sobre los arreglos; networkx solo se arma bajo pedido (Louvain, GEXF).
+    def __init__(self, etiquetas, indptr, indices, pesos):
+        self.etiquetas = etiquetas
+        self.indptr = indptr
+        self.indices = indices
+        self.pesos = pesos
+        self._networkx = None
+
+    @classmethod
+    def desde_aristas(cls, aristas):
+        # Ids renumerados por orden de aparición (nodos declarados y luego extremos de cada arista),
+        # el mismo orden en que networkx los habría agregado
+        extremos = np.column_stack([aristas.origen, aristas.destino]).ravel()
+        if aristas.nodos is not None:
+            extremos = np.concatenate([aristas.nodos, extremos])
+        unicos, primera = np.unique(extremos.astype(np.int64), return_index=True)
+        usados = unicos[np.argsort(primera, kind="stable")]
+        nuevo_id = np.empty(len(aristas.etiquetas), dtype=np.int64)
+        nuevo_id[usados] = np.arange(len(usados))
+        u = nuevo_id[aristas.origen]
+        v = nuevo_id[aristas.destino]
+        cruzadas = u != v
+        filas = np.concatenate([u, v[cruzadas]])
+        columnas = np.concatenate([v, u[cruzadas]])
+        pesos = np.concatenate([aristas.pesos, aristas.pesos[cruzadas]])
+        orden = np.lexsort((columnas, filas))
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(filas, minlength=len(usados)))])
+        return cls(aristas.etiquetas[usados], indptr, columnas[orden], pesos[orden])
+
+    @classmethod
+    def desde_networkx(cls, G):
+        ids = {n: i for i, n in enumerate(G)}
+        aristas = list(G.edges(data="weight", default=1))
+        origen = np.fromiter((ids[u] for u, _, _ in aristas), dtype=np.int64, count=len(aristas))
+        destino = np.fromiter((ids[v] for _, v, _ in aristas), dtype=np.int64, count=len(aristas))
+        pesos = np.fromiter((w for _, _, w in aristas), dtype=np.int64, count=len(aristas))
+        return cls.desde_aristas(Aristas(arreglo_etiquetas(list(ids)), origen, destino, pesos,
+                                         np.arange(len(ids), dtype=np.int64)))
+
+    def __len__(self):
+        return len(self.etiquetas)
+
+    def filas(self):
+        return np.repeat(np.arange(len(self)), np.diff(self.indptr))
+
+    def aristas(self):
+        # Cada arista una sola vez (fila <= columna)
+        filas = self.filas()
+        mitad = filas <= self.indices
+        return filas[mitad], self.indices[mitad], self.pesos[mitad]
+
+    def fuerza(self):
+        # Grado ponderado, igual que G.degree(weight="weight"): un lazo cuenta su peso dos veces
+        filas = self.filas()
+        lazos = filas == self.indices
+        return (np.bincount(filas, weights=self.pesos, minlength=len(self))
+                + np.bincount(filas[lazos], weights=self.pesos[lazos], minlength=len(self)))
+
+    def filtrar(self, permitidas):
+        # Subgrafo inducido por las etiquetas permitidas, sin los nodos que quedan aislados
+        conservar = np.fromiter((e in permitidas for e in self.etiquetas.tolist()), dtype=bool, count=len(self))
+        u, v, w = self.aristas()
+        dentro = conservar[u] & conservar[v]
+        return GrafoCSR.desde_aristas(Aristas(self.etiquetas, u[dentro], v[dentro], w[dentro]))
+
+    def disposicion(self, k=1, escala=1, semilla=42, iteraciones=50, umbral=1e-4):
+        # Fruchterman-Reingold con la misma inicialización y enfriamiento que nx.spring_layout (variante
+        # densa): la repulsión se calcula por bloques de nodos y la atracción solo sobre las aristas del CSR
+        n = len(self)
+        if n <= 1:
+            return np.zeros((n, 2))
+        pos = np.random.RandomState(semilla).rand(n, 2)
+        t = max(pos[:, 0].max() - pos[:, 0].min(), pos[:, 1].max() - pos[:, 1].min()) * 0.1
+        dt = t / (iteraciones + 1)
+        filas = self.filas()
+        for _ in range(iteraciones):
+            x, y = pos[:, 0], pos[:, 1]
+            desplazamiento = np.empty_like(pos)
+            for inicio in range(0, n, FILAS_BLOQUE_DISPOSICION):
+                bloque = slice(inicio, inicio + FILAS_BLOQUE_DISPOSICION)
+                dx = x[bloque, None] - x[None, :]
+                dy = y[bloque, None] - y[None, :]
+                repulsion = k * k / np.maximum(dx * dx + dy * dy, 1e-4)  # distancia mínima 0.01
+                desplazamiento[bloque, 0] = (dx * repulsion).sum(axis=1)
+                desplazamiento[bloque, 1] = (dy * repulsion).sum(axis=1)
+            delta = pos[filas] - pos[self.indices]
+            atraccion = self.pesos * np.maximum(np.linalg.norm(delta, axis=-1), 0.01) / k
+            desplazamiento[:, 0] -= np.bincount(filas, weights=delta[:, 0] * atraccion, minlength=n)
+            desplazamiento[:, 1] -= np.bincount(filas, weights=delta[:, 1] * atraccion, minlength=n)
+            longitud = np.linalg.norm(desplazamiento, axis=-1)
+            longitud = np.where(longitud < 0.01, 0.1, longitud)
+            paso = desplazamiento * (t / longitud)[:, None]
+            pos += paso
+            t -= dt
+            if np.linalg.norm(paso) / n < umbral:
+                break
+        pos -= pos.mean(axis=0)
+        limite = np.abs(pos).max()
+        return pos * (escala / limite) if limite > 0 else pos
+
+    def a_networkx(self):
+        # Adaptador para lo que solo existe en networkx (Louvain, write_gexf); se arma una vez por grafo
+        if self._networkx is None:
+            u, v, w = self.aristas()
+            G = nx.Graph()
+            G.add_nodes_from(self.etiquetas.tolist())
+            G.add_weighted_edges_from(zip(self.etiquetas[u].tolist(), self.etiquetas[v].tolist(), w.tolist()))
+            self._networkx = G
+        return self._networkx
+
+def arreglo_etiquetas(vocabulario):
+    # Arreglo de objetos para traducir ids a etiquetas con indexación de NumPy
+    etiquetas = np.empty(len(vocabulario), dtype=object)
+    etiquetas[:] = vocabulario
+    return etiquetas
+
+def sumar_pares_empaquetados(origen, destino, n, pesos=None):
+    # Pares no dirigidos como claves int64 min*n+max, agregados con un solo np.unique
+    claves = np.minimum(origen, destino) * n + np.maximum(origen, destino)
+    unicas, inversa = np.unique(claves, return_inverse=True)
+    pesos = np.bincount(inversa, weights=pesos, minlength=len(unicas)).astype(np.int64)
+    return unicas // max(n, 1), unicas % max(n, 1), pesos
+
+def red_desde_codigos(origen, destino, vocabulario):
+    # Conteo vectorizado de la red general sobre códigos enteros (-1 = celda vacía): cada par no dirigido
+    # se lleva a una clave min*V+max y se cuenta con un solo np.unique (~0.5 s para 2M filas, menos de lo
+    # que tarda en arrancar un proceso hijo: no se reparte). Se conservan el orden de aparición de nodos y
+    # aristas, la orientación del primer par y los nodos de filas con una sola celda llena.
+    origen = np.asarray(origen, dtype=np.int64)
+    destino = np.asarray(destino, dtype=np.int64)
+    intercalados = np.column_stack([origen, destino]).ravel()
+    intercalados = intercalados[intercalados >= 0]
+    unicos, primera = np.unique(intercalados, return_index=True)
+    nodos = unicos[np.argsort(primera, kind="stable")]
+
+    ambos = (origen >= 0) & (destino >= 0)
+    a = origen[ambos]
+    b = destino[ambos]
+    claves = np.minimum(a, b) * len(vocabulario) + np.maximum(a, b)
+    _, primera, pesos = np.unique(claves, return_index=True, return_counts=True)
+    orden = np.argsort(primera, kind="stable")
+    primera = primera[orden]
+    return Aristas(arreglo_etiquetas(vocabulario), a[primera], b[primera], pesos[orden], nodos)
 
-    app.lista_keywords = sorted(keywords_unicas)
-    return G
+def crear_red_general(df, source_col, target_col):
+    (origen, destino), vocabulario = codigos_compartidos(df[source_col].astype(str), df[target_col].astype(str))
+    return red_desde_codigos(origen, destino, vocabulario)
+
+def separar_keywords(raw_text):
+    if ";" in raw_text:
+        keywords = raw_text.split(";")
+    elif "," in raw_text:
+        keywords = raw_text.split(",")
+    elif "." in raw_text:
+        keywords = raw_text.split(".")
+    else:
+        keywords = [raw_text]
+    return [k.strip() for k in keywords if k.strip()]
+
+def fila_transpuesta(df, campo):
+    # Encabezados en columna: el campo es una fila; se toma completa de una vez (un valor por registro)
+    posiciones = np.flatnonzero(df.iloc[:, 0].astype(str).to_numpy() == campo)
+    if not len(posiciones):
+        raise KeyError(f"No se encontró el campo '{campo}' en la primera columna")
+    return df.iloc[posiciones[0], 1:].reset_index(drop=True)
+
+def serie_campo(df, campo, por_fila=True):
+    return df[campo] if por_fila else fila_transpuesta(df, campo)
+
+def red_general_series(serie_origen, serie_destino):
+    (c1, c2), vocabulario = codigos_compartidos(serie_origen, serie_destino)
+    return red_desde_codigos(c1, c2, vocabulario)
+
+def keywords_por_codigo(serie):
+    # Cada texto distinto se separa una sola vez; las keywords quedan como enteros
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype("category")
+    codigos = np.asarray(serie.cat.codes)
+    categorias = serie.cat.categories
+    ids = {}
+    por_codigo = {}
+    for codigo in np.unique(codigos).tolist():
+        raw_text = str(categorias[codigo]) if codigo >= 0 else "nan"  # str(NaN), como antes
+        por_codigo[codigo] = [ids.setdefault(k, len(ids)) for k in separar_keywords(raw_text)]
+    return codigos, por_codigo, list(ids)
+
+def matriz_incidencia(codigos, por_codigo, n_keywords):
+    # X documento×keyword en CSR (con multiplicidad si un texto repite una keyword). Se arma una fila
+    # por texto distinto y luego se indexa con los códigos de cada documento.
+    distintos = np.fromiter(por_codigo, dtype=np.int64, count=len(por_codigo))
+    largos = np.fromiter((len(por_codigo[c]) for c in distintos.tolist()), dtype=np.int64, count=len(distintos))
+    indices = np.fromiter((k for c in distintos.tolist() for k in por_codigo[c]), dtype=np.int64, count=int(largos.sum()))
+    indptr = np.concatenate([[0], np.cumsum(largos)])
+    por_texto = sparse.csr_matrix((np.ones(len(indices), dtype=np.int64), indices, indptr),
+                                  shape=(len(distintos), n_keywords))
+    por_texto.sum_duplicates()
+    return por_texto[np.searchsorted(distintos, codigos)]
+
+def red_incidencia(X, vocabulario, permitidas=None, procesos=1):
+    # Coocurrencias como XᵀX: fuera de la diagonal, pares entre keywords distintas; en la diagonal queda
+    # sum(m²) y los pares de una keyword repetida consigo misma son (m² - m) / 2. Con varios procesos y
+    # trabajo suficiente, cada uno multiplica un bloque de filas (ver conteo_paralelo).
+    if permitidas is not None:
+        columnas = [i for i, k in enumerate(vocabulario) if k in permitidas]
+        X = X[:, columnas]
+        vocabulario = [vocabulario[i] for i in columnas]
+    C = coocurrencias_en_paralelo(X, procesos).tocoo()
+    filas, columnas = C.row.astype(np.int64), C.col.astype(np.int64)
+    pesos = C.data.astype(np.int64)
+    ocurrencias = np.asarray(X.sum(axis=0)).ravel()
+    diagonal = filas == columnas
+    pesos[diagonal] = (pesos[diagonal] - ocurrencias[filas[diagonal]]) // 2
+    conservar = pesos > 0
+    return Aristas(arreglo_etiquetas(vocabulario), filas[conservar], columnas[conservar], pesos[conservar])
+
+def crear_red_palabras_clave(df, keywords_col, por_fila=True, procesos=1):
+    return red_palabras_clave(serie_campo(df, keywords_col, por_fila), procesos)
+
+def red_palabras_clave(serie, procesos=1):
+    # Las etiquetas de la red son todo el vocabulario de keywords (también las que quedan sin aristas)
+    codigos, por_codigo, vocabulario = keywords_por_codigo(serie)
+    if sparse is not None:
+        X = matriz_incidencia(codigos, por_codigo, len(vocabulario))
+        return red_incidencia(X, vocabulario, procesos=procesos)
+
+    # Sin scipy: los pares de cada texto distinto se generan una vez y pesan tantas veces como se repite
+    origen, destino, veces = [], [], []
+    for codigo, n in zip(*(a.tolist() for a in np.unique(codigos, return_counts=True))):
+        keywords = por_codigo[codigo]
+        for i in range(len(keywords)):
+            for j in range(i + 1, len(keywords)):
+                origen.append(keywords[i])
+                destino.append(keywords[j])
+                veces.append(n)
+    filas, columnas, pesos = sumar_pares_empaquetados(np.array(origen, dtype=np.int64), np.array(destino, dtype=np.int64),
+                                                      len(vocabulario), np.array(veces, dtype=np.int64))
+    return Aristas(arreglo_etiquetas(vocabulario), filas, columnas, pesos)
+
+def contar_bipartito(grupos):
+    # Red general por registro (valores de A, valores de B): nodo por cada valor, arista por cada par A×B.
+    # Las etiquetas se internan al leerlas y los pares se agregan por bloques con NumPy.
+    conteos = Conteos()
+    ids_a, largos_a, ids_b, largos_b = [], [], [], []
+    pendientes = 0
+    for valores_a, valores_b in grupos:
+        ids_a.extend(conteos.ids(valores_a))
+        ids_b.extend(conteos.ids(valores_b))
+        largos_a.append(len(valores_a))
+        largos_b.append(len(valores_b))
+        pendientes += len(valores_a) * len(valores_b) + 1
+        if pendientes >= PARES_POR_BLOQUE:
+            conteos.sumar_cruzados(ids_a, largos_a, ids_b, largos_b)
+            ids_a, largos_a, ids_b, largos_b = [], [], [], []
+            pendientes = 0
+    conteos.sumar_cruzados(ids_a, largos_a, ids_b, largos_b)
+    return conteos
+
+def contar_pares_general(filas):
+    # Mismo criterio que la red general: nodo por cada celda no vacía, arista si ambas lo están
+    conteos = Conteos()
+    ids = conteos.etiquetas
+    origen, destino = [], []
+    for n1, n2 in filas:
+        i = None if n1 is None else ids.setdefault(n1, len(ids))
+        j = None if n2 is None else ids.setdefault(n2, len(ids))
+        if i is not None and j is not None:
+            origen.append(i)
+            destino.append(j)
+            if len(origen) >= PARES_POR_BLOQUE:
+                conteos.sumar_pares(origen, destino)
+                origen, destino = [], []
+    conteos.sumar_pares(origen, destino)
+    return conteos
+
+def contar_coocurrencias(textos, permitidas=None):
+    # Cada keyword se interna al leerla; los pares de cada registro se generan por bloques con NumPy
+    conteos = Conteos()
+    ids, largos = [], []
+    pendientes = 0
+    for raw_text in textos:
+        if raw_text is None:
+            continue
+        keywords = raw_text if isinstance(raw_text, list) else separar_keywords(str(raw_text))
+        if permitidas is not None:
+            keywords = [k for k in keywords if k in permitidas]
+        ids.extend(conteos.ids(keywords))
+        largos.append(len(keywords))
+        pendientes += len(keywords) * (len(keywords) - 1) // 2 + 1
+        if pendientes >= PARES_POR_BLOQUE:
+            conteos.sumar_grupos(ids, largos)
+            ids, largos = [], []
+            pendientes = 0
+    conteos.sumar_grupos(ids, largos)
+    return conteos
+
+def contar_filas(filas, tipo, permitidas=None):
+    if tipo == "general":
+        return contar_pares_general(filas)
+    return contar_coocurrencias((fila[0] for fila in filas), permitidas)
+
+def fusionar_conteos(a, b):
+    # Reduce de conteos parciales: las etiquetas de b se internan en a (una consulta por etiqueta, no por
+    # par) y sus claves se traducen a los ids de a
+    ids = np.array(a.ids(b.etiquetas), dtype=np.int64)
+    claves, pesos = b.pares()
+    origen, destino = np.divmod(claves, BASE_CLAVE)
+    a.sumar_pares(ids[origen], ids[destino], pesos)
+    return a
+
+def red_desde_conteos(conteos, aislados=True):
+    # Conteos por id -> Aristas sin volver a pasar por las etiquetas. La red general conserva los nodos
+    # sin aristas; la de keywords solo los que coocurren con alguna otra
+    claves, pesos = conteos.pares()
+    origen, destino = np.divmod(claves, BASE_CLAVE)
+    nodos = np.arange(len(conteos.etiquetas)) if aislados else np.unique(np.concatenate([origen, destino]))
+    return Aristas(arreglo_etiquetas(list(conteos.etiquetas)), origen, destino, pesos, nodos)
+
+def dibujar_grafo_csr(ax, G, pos, node_sizes, node_colors, grosor, font_size):
+    # Equivale a nx.draw con etiquetas, leyendo aristas y posiciones de los arreglos del GrafoCSR. Cada
+    # arista toma el color de su primer extremo; los lazos no se trazan.
+    u, v, w = G.aristas()
+    cruzadas = u != v
+    u, v, w = u[cruzadas], v[cruzadas], w[cruzadas]
+    node_colors = np.asarray(node_colors)
+    ax.add_collection(LineCollection(np.stack([pos[u], pos[v]], axis=1), colors=node_colors[u],
+                                     linewidths=w * grosor, zorder=1))
+    ax.scatter(pos[:, 0], pos[:, 1], s=node_sizes, c=node_colors, zorder=2)
+    for etiqueta, (x, y) in zip(G.etiquetas.tolist(), pos.tolist()):
+        ax.text(x, y, str(etiqueta), fontsize=font_size, ha="center", va="center", zorder=3)
 
 def dibujar_red(G):
     if app.canvas_network:
@@ -95,11 +2151,11 @@ def dibujar_red(G):
     zoom = app.zoom_level
 
     fig, ax = plt.subplots(figsize=(8 * zoom, 6 * zoom))
-    pos = nx.spring_layout(G, seed=42, k=1, scale=zoom)
+    pos = G.disposicion(k=1, escala=zoom, semilla=42)
 
     # Obtener límites de posición para dar padding
-    x_vals = [x for x, y in pos.values()]
-    y_vals = [y for x, y in pos.values()]
+    x_vals = pos[:, 0].tolist()
+    y_vals = pos[:, 1].tolist()
     x_min, x_max = min(x_vals), max(x_vals)
     y_min, y_max = min(y_vals), max(y_vals)
 
@@ -111,7 +2167,6 @@ def dibujar_red(G):
     ax.set_ylim(y_min - y_padding, y_max + y_padding)
 
     grosor = slider_grosor.get()
-    weights = [edata["weight"] * grosor for _, _, edata in G.edges(data=True)]
 
     # Obtener un solo color del colormap seleccionado
     selected_cmap_name = combo_colormap.get()
@@ -119,7 +2174,7 @@ def dibujar_red(G):
     flat_color = cmap(0.3)  # Un color constante del mapa
 
     # Calcular tamaño de nodos basado en su grado (cantidad de conexiones)
-    raw_sizes = [G.degree(n, weight="weight") for n in G.nodes()]
+    raw_sizes = G.fuerza().tolist()
     min_size = 200  # tamaño mínimo
     max_size = 1500  # tamaño máximo
     if raw_sizes:
@@ -130,17 +2185,10 @@ def dibujar_red(G):
             for val in raw_sizes
         ]
     else:
-        node_sizes = [500 for _ in G.nodes()]
-
-    nx.draw(
-        G, pos, ax=ax,
-        with_labels=True,
-        node_size=node_sizes,
-        node_color=[flat_color] * len(G.nodes()),
-        edge_color=[flat_color] * len(G.edges()),
-        width=weights,
-        font_size=int(float(slider_texto.get()) * zoom)
-    )
+        node_sizes = [500] * len(G)
+
+    dibujar_grafo_csr(ax, G, pos, node_sizes, [flat_color] * len(G), grosor,
+                      int(float(slider_texto.get()) * zoom))
 
     ax.set_title("Red generada", fontsize=14)
     ax.axis("off")  # Oculta ejes
@@ -187,13 +2235,12 @@ def cargar_columnas_excel(*args):
         fila_ini = int(entry_fila_ini.get()) - 1  # base 1 -> base 0
         col_ini = int(entry_col_ini.get()) - 1    # base 1 -> base 0
         if app.tipo_encabezado.get() == "Fila":
-            df = app.excel_file.parse(hoja, header=fila_ini)
-            df = df.iloc[:, col_ini:]
-            app.df = df
+            grid, app.df_completo = obtener_hoja_cruda(hoja, fila_ini + 1 + FILAS_VISTA_PREVIA)
+            app.df = promover_encabezado(grid, fila_ini, col_ini)
             cargar_columnas_desde_df()
         else:
-            df_raw = app.excel_file.parse(hoja, header=None)
-            df_raw = df_raw.iloc[fila_ini:, col_ini:]
+            grid, app.df_completo = obtener_hoja_cruda(hoja, fila_ini + FILAS_VISTA_PREVIA)
+            df_raw = grid.iloc[fila_ini:, col_ini:]
             app.df_raw = df_raw
             cargar_columnas_desde_df_columnas_encabezado()
     except Exception as e:
@@ -203,20 +2250,30 @@ def cargar_columnas_desde_df_csv():
     try:
         fila_ini = int(entry_fila_ini.get()) - 1  # base 1 -> base 0
         col_ini = int(entry_col_ini.get()) - 1    # base 1 -> base 0
-        df = app.df_raw.iloc[fila_ini:, col_ini:]
-        if app.tipo_encabezado.get() == "Fila":
-            df.columns = df.iloc[0]  # Usa la primera fila como encabezado
-            df = df[1:]  # Elimina la fila de encabezado de los datos
-            app.df = df.reset_index(drop=True)  # Reinicia el índice
+        por_fila = app.tipo_encabezado.get() == "Fila"
+        # El parser recibe fila/columna de inicio: arma el DataFrame una sola vez y con tipos por columna,
+        # sin copiar para promover el encabezado
+        opciones = {"header": 0 if por_fila else None, "skiprows": fila_ini, "nrows": FILAS_VISTA_PREVIA}
+        if col_ini:
+            with abrir_entrada(app.filepath) as (flujo, _):
+                ancho = len(pd.read_csv(flujo, header=None, skiprows=fila_ini, nrows=1).columns)
+            opciones["usecols"] = range(col_ini, ancho)
+        with abrir_entrada(app.filepath) as (flujo, _):
+            df = pd.read_csv(flujo, **opciones)
+        app.df_completo = len(df) < FILAS_VISTA_PREVIA
+        if por_fila:
+            app.df = a_categorias(df) if app.df_completo else df
             cargar_columnas_desde_df()
         else:
-            app.df_raw = df.reset_index(drop=True)
+            app.df_raw = df
             cargar_columnas_desde_df_columnas_encabezado()
     except Exception as e:
         messagebox.showerror("Error", f"No se pudo procesar CSV:\n{e}")
 
 def cargar_columnas_desde_df():
     columnas = list(app.df.columns)
+    app.columnas_vista_previa = columnas
+    app.columnas_cargadas = None
     combo_source['values'] = columnas
     combo_target['values'] = columnas
     combo_keywords['values'] = columnas
@@ -230,6 +2287,7 @@ def cargar_columnas_desde_df_columnas_encabezado():
         df = app.df_raw
         df = df.iloc[:, col_ini:]
         app.df = df
+        app.columnas_cargadas = None
         campos = list(df.iloc[:, 0].dropna().astype(str))  # Encabezados en columna
         combo_source['values'] = campos
         combo_target['values'] = campos
@@ -251,46 +2309,53 @@ def generar_red_general():
         messagebox.showwarning("Aviso", "Selecciona columna origen y destino.")
         return
 
-    G = nx.Graph()
+    app.red_actual = ("general", [origen, destino], None)
+    if contar_fuera_de_memoria([origen, destino], "general",
+                               lambda conteos: mostrar_red_general(GrafoCSR.desde_aristas(red_desde_conteos(conteos)))):
+        return
+    asegurar_datos_completos([origen, destino], lambda: construir_red_general(origen, destino))
 
-    # Agrega todos los nodos aunque no tengan relaciones
-    if app.tipo_encabezado.get() == "Fila":
-        for _, row in app.df.iterrows():
-            n1 = row[origen]
-            n2 = row[destino]
-            if not pd.isna(n1):
-                G.add_node(n1)
-            if not pd.isna(n2):
-                G.add_node(n2)
-            if pd.isna(n1) or pd.isna(n2):
-                continue
-            if G.has_edge(n1, n2):
-                G[n1][n2]["weight"] += 1
-            else:
-                G.add_edge(n1, n2, weight=1)
+def construir_en_segundo_plano(texto, construir, mostrar):
+    # construir() corre en un hilo (y puede abrir un pool de procesos) sin congelar la interfaz;
+    # mostrar(resultado) vuelve al hilo de Tk, que recupera el estado que tenía antes de construir
+    if app.evento_cancelar is not None:
+        messagebox.showwarning("Aviso", "Ya hay una carga en curso.")
+        return
+    estado = label_estado.cget("text")
+
+    def tarea(reportar, cancelado):
+        reportar(texto)
+        return construir()
+
+    def red_lista(resultado):
+        label_estado.config(text=estado)
+        mostrar(resultado)
 
+    ejecutar_en_segundo_plano(tarea, red_lista)
+
+def construir_red_general(origen, destino):
+    # Agrega todos los nodos aunque no tengan relaciones
+    df = app.df
+    if app.formato and {origen, destino} & CAMPOS_MULTIVALOR:
+        def construir():
+            return GrafoCSR.desde_aristas(red_desde_conteos(contar_registros(df, [origen, destino], "general")))
     else:
-        df = app.df
-        try:
-            idx_origen = df[df.iloc[:, 0] == origen].index[0]
-            idx_destino = df[df.iloc[:, 0] == destino].index[0]
-            for col_i in df.columns[1:]:
-                n1 = df.at[idx_origen, col_i]
-                n2 = df.at[idx_destino, col_i]
-                if not pd.isna(n1):
-                    G.add_node(n1)
-                if not pd.isna(n2):
-                    G.add_node(n2)
-                if pd.isna(n1) or pd.isna(n2):
-                    continue
-                if G.has_edge(n1, n2):
-                    G[n1][n2]["weight"] += 1
-                else:
-                    G.add_edge(n1, n2, weight=1)
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo generar red con encabezado en columna:\n{e}")
-            return
+        if app.tipo_encabezado.get() == "Fila":
+            series = df[origen], df[destino]
+        else:
+            # Encabezados en columna: las dos filas se comparan como vectores, igual que dos columnas
+            try:
+                series = fila_transpuesta(df, origen), fila_transpuesta(df, destino)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo generar red con encabezado en columna:\n{e}")
+                return
+
+        def construir():
+            return GrafoCSR.desde_aristas(red_general_series(*series))
+
+    construir_en_segundo_plano("⏳ Construyendo red general...", construir, mostrar_red_general)
 
+def mostrar_red_general(G):
     app.grafo_general = G
     app.grafo_keywords = None
     app.red_con_cluster = False
@@ -307,16 +2372,53 @@ def generar_red_keywords():
         messagebox.showwarning("Aviso", "Selecciona la columna de palabras clave.")
         return
 
-    if app.tipo_encabezado.get() == "Fila":
-        G = crear_red_palabras_clave(app.df, col)
-        app.grafo_keywords = G
-        app.grafo_general = None  # Limpiar red general
-        app.red_con_cluster = False
-        app.cluster_partition = None
-        app.grafo_clusterizado_actual = None
-        dibujar_red(G)
+    app.red_actual = ("keywords", [col], None)
+    if contar_fuera_de_memoria([col], "keywords", mostrar_red_keywords_conteos):
+        return
+    asegurar_datos_completos([col], lambda: construir_red_keywords(col))
+
+def mostrar_red_keywords_conteos(conteos):
+    app.lista_keywords = sorted(conteos.etiquetas)
+    mostrar_red_keywords(GrafoCSR.desde_aristas(red_desde_conteos(conteos, aislados=False)))
+
+def construir_red_keywords(col):
+    df = app.df
+    procesos = procesos_configurados()
+    if app.formato and col in CAMPOS_MULTIVALOR:
+        if sparse is None:
+            def construir():
+                conteos = contar_registros(df, [col], "keywords")
+                return GrafoCSR.desde_aristas(red_desde_conteos(conteos, aislados=False)), sorted(conteos.etiquetas)
+        else:
+            def construir():
+                red, vocabulario = red_coocurrencia_larga(tabla_larga(df, col), procesos=procesos)
+                return GrafoCSR.desde_aristas(red), sorted(vocabulario)
     else:
-        messagebox.showinfo("Info", "Generación de red de keywords para encabezado en columna no implementada aún.")
+        try:
+            serie = serie_campo(df, col, app.tipo_encabezado.get() == "Fila")
+        except KeyError as e:
+            messagebox.showerror("Error", f"No se pudo generar red con encabezado en columna:\n{e}")
+            return
+
+        def construir():
+            red = red_palabras_clave(serie, procesos)
+            return GrafoCSR.desde_aristas(red), sorted(red.etiquetas.tolist())
+
+    def red_lista(resultado):
+        G, app.lista_keywords = resultado
+        mostrar_red_keywords(G)
+
+    construir_en_segundo_plano("⏳ Construyendo red de keywords...", construir, red_lista)
+
+def mostrar_red_keywords(G):
+    app.grafo_keywords = G
+    red = app.red_actual
+    app.keywords_sin_filtro = (red[1][0], G) if red is not None and red[2] is None else None  # base para filtrar sin recontar
+    app.grafo_general = None  # Limpiar red general
+    app.red_con_cluster = False
+    app.cluster_partition = None
+    app.grafo_clusterizado_actual = None
+    dibujar_red(G)
 
 def exportar_png():
     if app.canvas_network:
@@ -349,7 +2451,7 @@ def exportar_gexf():
         filetypes=[("GEXF File", "*.gexf")]
     )
     if archivo:
-        nx.write_gexf(grafo, archivo)
+        nx.write_gexf(grafo.a_networkx(), archivo)
 
 def redibujar_grafo():
     if hasattr(app, "grafo_keywords") and app.grafo_keywords is not None:
@@ -370,15 +2472,15 @@ def aplicar_clustering_y_dibujar(G):
 
     zoom = app.zoom_level
     fig, ax = plt.subplots(figsize=(8 * zoom, 6 * zoom))
-    pos = nx.spring_layout(G, seed=42, k=1, scale=zoom)
+    pos = G.disposicion(k=1, escala=zoom, semilla=42)
 
     # Solo calcular la partición si no está guardada
     if app.cluster_partition is None or app.grafo_clusterizado_actual is not G:
-        app.cluster_partition = community_louvain.best_partition(G)
+        app.cluster_partition = community_louvain.best_partition(G.a_networkx())
         app.grafo_clusterizado_actual = G  # Guarda el grafo actual
 
     # Detectar comunidades
-    partition = community_louvain.best_partition(G)
+    partition = community_louvain.best_partition(G.a_networkx())
 
     # Obtener colormap desde el combo
     selected_cmap_name = combo_colormap.get()
@@ -387,15 +2489,12 @@ def aplicar_clustering_y_dibujar(G):
     # Colores por comunidad
     communities = list(set(partition.values()))
     color_map = cmap.resampled(len(communities))
-    node_colors = [color_map(partition[node]) for node in G.nodes()]
-    node_color_map = {node: color for node, color in zip(G.nodes(), node_colors)}
-    edge_colors = [node_color_map[u] for u, v in G.edges()]
+    node_colors = [color_map(partition[node]) for node in G.etiquetas.tolist()]
 
     grosor = slider_grosor.get()
-    weights = [edata["weight"] * grosor for _, _, edata in G.edges(data=True)]
 
     # Calcular tamaño de nodos basado en su grado (cantidad de conexiones)
-    raw_sizes = [G.degree(n, weight="weight") for n in G.nodes()]
+    raw_sizes = G.fuerza().tolist()
     min_size = 200  # tamaño mínimo
     max_size = 1500  # tamaño máximo
     if raw_sizes:
@@ -406,17 +2505,9 @@ def aplicar_clustering_y_dibujar(G):
             for val in raw_sizes
         ]
     else:
-        node_sizes = [500 for _ in G.nodes()]
-
-    nx.draw(
-        G, pos, ax=ax,
-        with_labels=True,
-        node_size=node_sizes,
-        node_color=node_colors,
-        edge_color=edge_colors,
-        width=weights,
-        font_size=int(float(slider_texto.get()) * zoom)
-    )
+        node_sizes = [500] * len(G)
+
+    dibujar_grafo_csr(ax, G, pos, node_sizes, node_colors, grosor, int(float(slider_texto.get()) * zoom))
 
     ax.set_title("Red con clústeres detectados", fontsize=14)
     ax.axis("off")
@@ -493,183 +2584,256 @@ def mostrar_filtro_keywords():
 
         # Crear red filtrada
         col = combo_keywords.get()
-        G = nx.Graph()
-        for _, row in app.df.iterrows():
-            try:
-                keywords = str(row[col]).split(";")
-                keywords = [k.strip() for k in keywords if k.strip() and k.strip() in keywords_seleccionadas]
-                for i in range(len(keywords)):
-                    for j in range(i + 1, len(keywords)):
-                        k1, k2 = keywords[i], keywords[j]
-                        if G.has_edge(k1, k2):
-                            G[k1][k2]["weight"] += 1
-                        else:
-                            G.add_edge(k1, k2, weight=1)
-            except:
-                continue
-        app.grafo_keywords = G
+        app.red_actual = ("keywords", [col], set(keywords_seleccionadas))
+        def red_filtrada(conteos):
+            app.grafo_keywords = GrafoCSR.desde_aristas(red_desde_conteos(conteos, aislados=False))
+            app.red_con_cluster = False
+            dibujar_red(app.grafo_keywords)
+
+        base = app.keywords_sin_filtro
+        if base is not None and base[0] == col:
+            # El peso de un par no depende de las demás keywords: basta recortar la red completa, sin recontar
+            app.grafo_keywords = base[1].filtrar(set(keywords_seleccionadas))
+            app.red_con_cluster = False
+            dibujar_red(app.grafo_keywords)
+            ventana.destroy()
+            return
+        if contar_fuera_de_memoria([col], "keywords", red_filtrada, set(keywords_seleccionadas)):
+            ventana.destroy()
+            return
+        # Mismo criterio de separación que la red completa (separar_keywords)
+        valores = serie_campo(app.df, col, app.tipo_encabezado.get() == "Fila").tolist()
+        conteos = contar_coocurrencias(valores, set(keywords_seleccionadas))
+        app.grafo_keywords = GrafoCSR.desde_aristas(red_desde_conteos(conteos, aislados=False))
         app.red_con_cluster = False
-        dibujar_red(G)
+        dibujar_red(app.grafo_keywords)
         ventana.destroy()
 
     tk.Button(ventana, text="Aplicar filtro", command=aplicar_filtro, bg="#219ebc", fg="white").pack(pady=10)
 
-# Interfaz
-app = tk.Tk()
-app.filepath = None
-app.excel_file = None
-app.df_raw = None
-app.hojas = []
-app.tipo_encabezado = tk.StringVar(value="Fila")
-app.title("Visualizador de Redes Bibliométricas")
-app.geometry("1200x700")
-app.configure(bg="#e0f7fa")
-app.canvas_network = None
-app.zoom_level = 1.0  # Nivel de zoom inicial
-app.node_color = "#90caf9"
-app.cluster_partition = None
-
-style = {"font": ("Arial", 10), "bg": "#f0f4f8"}
-
-# Contenedor horizontal
-frame_contenedor_horizontal = tk.Frame(app, bg="#f0f4f8")
-frame_contenedor_horizontal.pack(fill="both", expand=True)
-
-frame_controles = tk.Frame(frame_contenedor_horizontal, bg="#f0f4f8", width=280)
-frame_controles.pack(side="left", fill="y", padx=10, pady=10)
-
-frame_output = tk.Frame(frame_contenedor_horizontal, bg="white")
-frame_output.pack(side="right", fill="both", expand=True, padx=10, pady=10)
-
-# Controles
-tk.Button(frame_controles, text="📂 Cargar archivo CSV/XLSX", command=cargar_archivo,
-          font=("Segoe UI", 11, "bold"), bg="#8ecae6", fg="white", padx=10, pady=6).pack(pady=(5,5))
-
-label_estado = tk.Label(frame_controles, text="", font=("Segoe UI", 10), fg="green", bg="#f0f4f8")
-label_estado.pack()
-
-tk.Label(frame_controles, text="Selecciona hoja (solo Excel):", font=("Arial", 10), bg="#f0f4f8").pack(anchor="w", padx=5, pady=(15,0))
-combo_hojas = ttk.Combobox(frame_controles, width=28)
-combo_hojas.pack(padx=5, pady=5)
-combo_hojas.bind("<<ComboboxSelected>>", manejar_cambio_hoja)
-
-# Campos fila/columna
-frame_filas_cols = tk.Frame(frame_controles, bg="#f0f4f8")
-frame_filas_cols.pack(anchor="w", padx=5, pady=(10,5))
-
-tk.Label(frame_filas_cols, text="Fila inicio (1 base):", bg="#f0f4f8").grid(row=0, column=0, sticky="w")
-entry_fila_ini = tk.Entry(frame_filas_cols, width=6)
-entry_fila_ini.grid(row=0, column=1, padx=5)
-entry_fila_ini.insert(1, "1")
-
-tk.Label(frame_filas_cols, text="Columna inicio (1 base):", bg="#f0f4f8").grid(row=1, column=0, sticky="w")
-entry_col_ini = tk.Entry(frame_filas_cols, width=6)
-entry_col_ini.grid(row=1, column=1, padx=5)
-entry_col_ini.insert(1, "1")
-
-tk.Label(frame_controles, text="¿Los encabezados están en fila o columna?", font=("Arial", 10), bg="#f0f4f8").pack(anchor="w", padx=5, pady=(10,0))
-radio_fila = tk.Radiobutton(frame_controles, text="Fila", variable=app.tipo_encabezado, value="Fila", bg="#f0f4f8", command=manejar_cambio_hoja)
-radio_columna = tk.Radiobutton(frame_controles, text="Columna", variable=app.tipo_encabezado, value="Columna", bg="#f0f4f8", command=manejar_cambio_hoja)
-radio_fila.pack(anchor="w", padx=10)
-radio_columna.pack(anchor="w", padx=10)
-
-entry_fila_ini.bind("<FocusOut>", manejar_cambio_hoja)
-entry_col_ini.bind("<FocusOut>", manejar_cambio_hoja)
-entry_fila_ini.bind("<Return>", manejar_cambio_hoja)
-entry_col_ini.bind("<Return>", manejar_cambio_hoja)
-
-tk.Label(frame_controles, text="Columna origen:", **style).pack(anchor="w", padx=5, pady=(15, 0))
-combo_source = ttk.Combobox(frame_controles, width=35)
-combo_source.pack(padx=5, pady=5)
-
-tk.Label(frame_controles, text="Columna destino:", **style).pack(anchor="w", padx=5)
-combo_target = ttk.Combobox(frame_controles, width=35)
-combo_target.pack(padx=5, pady=5)
-
-tk.Label(frame_controles, text="Columna palabras clave:", **style).pack(anchor="w", padx=5, pady=(15, 0))
-combo_keywords = ttk.Combobox(frame_controles, width=35)
-combo_keywords.pack(padx=5, pady=5)
-
-tk.Button(frame_controles, text="🌐 Generar red general", command=generar_red_general,
-          font=("Segoe UI", 10, "bold"), bg="#219ebc", fg="white").pack(pady=(20, 5))
-
-tk.Button(frame_controles, text="🔑 Generar red de keywords", command=generar_red_keywords,
-          font=("Segoe UI", 10, "bold"), bg="#023047", fg="white").pack(pady=5)
-
-tk.Button(frame_controles, text="💾 Exportar PNG", command=exportar_png,
-          font=("Segoe UI", 10), bg="#ffb703", fg="black").pack(pady=(20, 5))
-
-tk.Button(frame_controles, text="📁 Exportar GEXF", command=exportar_gexf,
-          font=("Segoe UI", 10), bg="#fb8500", fg="black").pack(pady=5)
-
-def seleccionar_color():
-    color = colorchooser.askcolor(title="Seleccionar color de nodos")[1]
-    if color:
-        app.node_color = color
+if __name__ == "__main__":
+    # Interfaz (protegida para que los procesos hijos puedan importar este módulo)
+    multiprocessing.freeze_support()
+    app = tk.Tk()
+    app.filepath = None
+    app.excel_file = None
+    app.df_raw = None
+    app.hojas = []
+    app.evento_cancelar = None  # threading.Event de la carga en curso
+    app.df_completo = False  # app.df contiene todas las filas del archivo
+    app.columnas_cargadas = None  # columnas leídas completas (modo Fila)
+    app.columnas_vista_previa = []
+    app.cache_hojas = {}  # (archivo, hoja) -> (rejilla cruda, completa)
+    app.parametros_vista_previa = None
+    app.tipo_encabezado = tk.StringVar(value="Fila")
+    app.combinar_hojas = tk.BooleanVar(value=False)
+    app.modo_streaming = tk.BooleanVar(value=False)
+    app.carpeta_vigilada = None  # carpeta en modo vigilancia
+    app.archivos_vistos = set()
+    app.tamanos_pendientes = {}  # archivos nuevos esperando a que su tamaño se estabilice
+    app.red_actual = None  # (tipo, columnas, keywords permitidas) de la red mostrada
+    app.keywords_sin_filtro = None  # (columna, GrafoCSR) de la última red de keywords completa
+    app.quitar_duplicados = tk.BooleanVar(value=True)  # índice por DOI y título + año al ingerir exportes
+    app.usar_cache = tk.BooleanVar(value=feather is not None)
+    app.corpus = None  # lista de archivos cuando se carga un corpus de varios exportes
+    app.formato = None  # clave del lector bibliográfico del archivo actual (p. ej. "scopus")
+    app.title("Visualizador de Redes Bibliométricas")
+    app.geometry("1200x700")
+    app.configure(bg="#e0f7fa")
+    app.canvas_network = None
+    app.zoom_level = 1.0  # Nivel de zoom inicial
+    app.node_color = "#90caf9"
+    app.cluster_partition = None
+
+    style = {"font": ("Arial", 10), "bg": "#f0f4f8"}
+
+    # Contenedor horizontal
+    frame_contenedor_horizontal = tk.Frame(app, bg="#f0f4f8")
+    frame_contenedor_horizontal.pack(fill="both", expand=True)
+
+    frame_controles = tk.Frame(frame_contenedor_horizontal, bg="#f0f4f8", width=280)
+    frame_controles.pack(side="left", fill="y", padx=10, pady=10)
+
+    frame_output = tk.Frame(frame_contenedor_horizontal, bg="white")
+    frame_output.pack(side="right", fill="both", expand=True, padx=10, pady=10)
+
+    # Controles
+    tk.Button(frame_controles, text="📂 Cargar archivo CSV/XLSX", command=cargar_archivo,
+              font=("Segoe UI", 11, "bold"), bg="#8ecae6", fg="white", padx=10, pady=6).pack(pady=(5,5))
+
+    frame_corpus = tk.Frame(frame_controles, bg="#f0f4f8")
+    frame_corpus.pack(pady=(0, 5))
+    tk.Button(frame_corpus, text="📚 Varios archivos", command=cargar_corpus,
+              font=("Segoe UI", 9), bg="#8ecae6", fg="white").pack(side="left", padx=2)
+    tk.Button(frame_corpus, text="📁 Carpeta", command=lambda: cargar_corpus(desde_carpeta=True),
+              font=("Segoe UI", 9), bg="#8ecae6", fg="white").pack(side="left", padx=2)
+    tk.Button(frame_corpus, text="🗄️ Guardar almacén", command=guardar_en_almacen,
+              font=("Segoe UI", 9), bg="#8ecae6", fg="white").pack(side="left", padx=2)
+    boton_vigilar = tk.Button(frame_controles, text="👁️ Vigilar carpeta", command=alternar_vigilancia,
+                              font=("Segoe UI", 9), bg="#8ecae6", fg="white")
+    boton_vigilar.pack(pady=(0, 5))
+
+    label_estado = tk.Label(frame_controles, text="", font=("Segoe UI", 10), fg="green", bg="#f0f4f8")
+    label_estado.pack()
+
+    boton_cancelar = tk.Button(frame_controles, text="⛔ Cancelar carga", command=cancelar_carga,
+                               font=("Segoe UI", 9), bg="#e63946", fg="white", state="disabled")
+    boton_cancelar.pack(pady=(2, 0))
+
+    tk.Label(frame_controles, text="Selecciona hoja (solo Excel):", font=("Arial", 10), bg="#f0f4f8").pack(anchor="w", padx=5, pady=(15,0))
+    combo_hojas = ttk.Combobox(frame_controles, width=28)
+    combo_hojas.pack(padx=5, pady=5)
+    combo_hojas.bind("<<ComboboxSelected>>", manejar_cambio_hoja)
+    tk.Checkbutton(frame_controles, text="Combinar todas las hojas (carga en paralelo)",
+                   variable=app.combinar_hojas, command=manejar_cambio_hoja, bg="#f0f4f8").pack(anchor="w", padx=5)
+    tk.Checkbutton(frame_controles, text="Modo streaming (CSV/XLSX grandes)",
+                   variable=app.modo_streaming, bg="#f0f4f8").pack(anchor="w", padx=5)
+    tk.Checkbutton(frame_controles, text="Eliminar duplicados (DOI / título + año)",
+                   variable=app.quitar_duplicados, bg="#f0f4f8").pack(anchor="w", padx=5)
+
+    frame_cache = tk.Frame(frame_controles, bg="#f0f4f8")
+    frame_cache.pack(anchor="w", padx=5)
+    tk.Checkbutton(frame_cache, text="Caché en disco" if feather is not None else "Caché en disco (requiere pyarrow)",
+                   variable=app.usar_cache, bg="#f0f4f8",
+                   state="normal" if feather is not None else "disabled").grid(row=0, column=0, sticky="w")
+    tk.Label(frame_cache, text="Límite (MB):", bg="#f0f4f8").grid(row=0, column=1, padx=(5, 0))
+    entry_limite_cache = tk.Entry(frame_cache, width=6)
+    entry_limite_cache.grid(row=0, column=2, padx=5)
+    entry_limite_cache.insert(0, str(LIMITE_CACHE_MB))
+    tk.Label(frame_cache, text="Procesos:", bg="#f0f4f8").grid(row=1, column=1, padx=(5, 0), sticky="e")
+    entry_procesos = tk.Entry(frame_cache, width=6)
+    entry_procesos.grid(row=1, column=2, padx=5)
+    entry_procesos.insert(0, str(MAX_PROCESOS))
+
+    # Subconjunto del almacén SQLite (solo al abrir un .sqlite)
+    frame_almacen = tk.Frame(frame_controles, bg="#f0f4f8")
+    frame_almacen.pack(anchor="w", padx=5)
+    tk.Label(frame_almacen, text="Almacén · años:", bg="#f0f4f8").grid(row=0, column=0, sticky="w")
+    entry_anio_desde = tk.Entry(frame_almacen, width=6)
+    entry_anio_desde.grid(row=0, column=1, padx=2)
+    entry_anio_hasta = tk.Entry(frame_almacen, width=6)
+    entry_anio_hasta.grid(row=0, column=2, padx=2)
+    tk.Label(frame_almacen, text="Fuente:", bg="#f0f4f8").grid(row=1, column=0, sticky="w")
+    entry_fuente_almacen = tk.Entry(frame_almacen, width=20)
+    entry_fuente_almacen.grid(row=1, column=1, columnspan=2, padx=2, sticky="w")
+
+    # Campos fila/columna
+    frame_filas_cols = tk.Frame(frame_controles, bg="#f0f4f8")
+    frame_filas_cols.pack(anchor="w", padx=5, pady=(10,5))
+
+    tk.Label(frame_filas_cols, text="Fila inicio (1 base):", bg="#f0f4f8").grid(row=0, column=0, sticky="w")
+    entry_fila_ini = tk.Entry(frame_filas_cols, width=6)
+    entry_fila_ini.grid(row=0, column=1, padx=5)
+    entry_fila_ini.insert(1, "1")
+
+    tk.Label(frame_filas_cols, text="Columna inicio (1 base):", bg="#f0f4f8").grid(row=1, column=0, sticky="w")
+    entry_col_ini = tk.Entry(frame_filas_cols, width=6)
+    entry_col_ini.grid(row=1, column=1, padx=5)
+    entry_col_ini.insert(1, "1")
+
+    tk.Label(frame_controles, text="¿Los encabezados están en fila o columna?", font=("Arial", 10), bg="#f0f4f8").pack(anchor="w", padx=5, pady=(10,0))
+    radio_fila = tk.Radiobutton(frame_controles, text="Fila", variable=app.tipo_encabezado, value="Fila", bg="#f0f4f8", command=manejar_cambio_hoja)
+    radio_columna = tk.Radiobutton(frame_controles, text="Columna", variable=app.tipo_encabezado, value="Columna", bg="#f0f4f8", command=manejar_cambio_hoja)
+    radio_fila.pack(anchor="w", padx=10)
+    radio_columna.pack(anchor="w", padx=10)
+
+    entry_fila_ini.bind("<FocusOut>", manejar_cambio_hoja)
+    entry_col_ini.bind("<FocusOut>", manejar_cambio_hoja)
+    entry_fila_ini.bind("<Return>", manejar_cambio_hoja)
+    entry_col_ini.bind("<Return>", manejar_cambio_hoja)
+
+    tk.Label(frame_controles, text="Columna origen:", **style).pack(anchor="w", padx=5, pady=(15, 0))
+    combo_source = ttk.Combobox(frame_controles, width=35)
+    combo_source.pack(padx=5, pady=5)
+
+    tk.Label(frame_controles, text="Columna destino:", **style).pack(anchor="w", padx=5)
+    combo_target = ttk.Combobox(frame_controles, width=35)
+    combo_target.pack(padx=5, pady=5)
+
+    tk.Label(frame_controles, text="Columna palabras clave:", **style).pack(anchor="w", padx=5, pady=(15, 0))
+    combo_keywords = ttk.Combobox(frame_controles, width=35)
+    combo_keywords.pack(padx=5, pady=5)
+
+    tk.Button(frame_controles, text="🌐 Generar red general", command=generar_red_general,
+              font=("Segoe UI", 10, "bold"), bg="#219ebc", fg="white").pack(pady=(20, 5))
+
+    tk.Button(frame_controles, text="🔑 Generar red de keywords", command=generar_red_keywords,
+              font=("Segoe UI", 10, "bold"), bg="#023047", fg="white").pack(pady=5)
+
+    tk.Button(frame_controles, text="💾 Exportar PNG", command=exportar_png,
+              font=("Segoe UI", 10), bg="#ffb703", fg="black").pack(pady=(20, 5))
+
+    tk.Button(frame_controles, text="📁 Exportar GEXF", command=exportar_gexf,
+              font=("Segoe UI", 10), bg="#fb8500", fg="black").pack(pady=5)
+
+    def seleccionar_color():
+        color = colorchooser.askcolor(title="Seleccionar color de nodos")[1]
+        if color:
+            app.node_color = color
+            redibujar_grafo()
+
+    tk.Button(frame_controles, text="🎨 Detectar y colorear clústeres",
+              command=lambda: aplicar_clustering_y_dibujar(
+                  app.grafo_keywords if app.grafo_keywords else app.grafo_general),
+              font=("Segoe UI", 10), bg="#6a994e", fg="white").pack(pady=10)
+
+    tk.Label(frame_controles, text="🎨 Esquema de color para clústeres", **style).pack(pady=(10, 0))
+    combo_colormap = ttk.Combobox(frame_controles, values=[
+        "Set1", "Set2", "Set3", "Pastel1", "Accent", "Dark2", "Paired", "Spectral"
+    ])
+    combo_colormap.set("tab20")  # Valor por defecto
+    combo_colormap.pack(padx=5, pady=(0, 10))
+    combo_colormap.bind("<<ComboboxSelected>>", lambda event: redibujar_grafo())
+
+    tk.Button(frame_controles, text="🧮 Filtrar palabras clave",
+              command=mostrar_filtro_keywords,
+              font=("Segoe UI", 10), bg="#0077b6", fg="white").pack(pady=(5, 10))
+
+
+    # Controles a la derecha del grafo
+    frame_controles_derechos = tk.Frame(frame_output, bg="#f0f4f8", width=240)
+    frame_controles_derechos.pack(side="right", fill="y", padx=(0, 0), pady=0)
+
+    label_grosor = tk.Label(frame_controles_derechos, text="Grosor de aristas", **style)
+    label_grosor.pack(pady=(10,10))
+
+    slider_grosor = tk.Scale(
+        frame_controles_derechos,
+        from_=0.1,
+        to=5,
+        resolution=0.1,
+        orient="horizontal",
+        length=200,
+        bg="#f0f4f8"
+        #command=lambda val: redibujar_grafo()
+    )
+    slider_grosor.set(1.0)
+    slider_grosor.pack()
+
+    def actualizar_zoom(valor):
+        app.zoom_level = float(valor)
         redibujar_grafo()
 
-tk.Button(frame_controles, text="🎨 Detectar y colorear clústeres",
-          command=lambda: aplicar_clustering_y_dibujar(
-              app.grafo_keywords if app.grafo_keywords else app.grafo_general),
-          font=("Segoe UI", 10), bg="#6a994e", fg="white").pack(pady=10)
-
-tk.Label(frame_controles, text="🎨 Esquema de color para clústeres", **style).pack(pady=(10, 0))
-combo_colormap = ttk.Combobox(frame_controles, values=[
-    "Set1", "Set2", "Set3", "Pastel1", "Accent", "Dark2", "Paired", "Spectral"
-])
-combo_colormap.set("tab20")  # Valor por defecto
-combo_colormap.pack(padx=5, pady=(0, 10))
-combo_colormap.bind("<<ComboboxSelected>>", lambda event: redibujar_grafo())
-
-tk.Button(frame_controles, text="🧮 Filtrar palabras clave",
-          command=mostrar_filtro_keywords,
-          font=("Segoe UI", 10), bg="#0077b6", fg="white").pack(pady=(5, 10))
-
-
-# Controles a la derecha del grafo
-frame_controles_derechos = tk.Frame(frame_output, bg="#f0f4f8", width=240)
-frame_controles_derechos.pack(side="right", fill="y", padx=(0, 0), pady=0)
-
-label_grosor = tk.Label(frame_controles_derechos, text="Grosor de aristas", **style)
-label_grosor.pack(pady=(10,10))
-
-slider_grosor = tk.Scale(
-    frame_controles_derechos,
-    from_=0.1,
-    to=5,
-    resolution=0.1,
-    orient="horizontal",
-    length=200,
-    bg="#f0f4f8"
-    #command=lambda val: redibujar_grafo()
-)
-slider_grosor.set(1.0)
-slider_grosor.pack()
-
-def actualizar_zoom(valor):
-    app.zoom_level = float(valor)
-    redibujar_grafo()
-
-tk.Label(frame_controles_derechos, text="🔍 Zoom del grafo", **style).pack(pady=(25, 10))
-zoom_slider = tk.Scale(frame_controles_derechos, from_=0.1, to=3, resolution=0.1, orient="horizontal",
-                       length=200, command=actualizar_zoom, bg="#f0f4f8")
-zoom_slider.set(1.0)
-zoom_slider.pack(pady=(10, 10))
-
-tk.Label(frame_controles_derechos, text="🔠 Tamaño de texto", **style).pack(pady=(10, 10))
-slider_texto = tk.Scale(frame_controles_derechos, from_=1, to=20, resolution=1, orient="horizontal",
-                        length=200, bg="#f0f4f8", command=lambda val: redibujar_grafo())
-slider_texto.set(9)
-slider_texto.pack(pady=(10, 10))
-slider_grosor.config(command=lambda val: redibujar_grafo())
-
-# Función para cerrar la aplicación
-def cerrar_app():
-    app.quit()  # Esto asegura que el mainloop se detiene correctamente
-
-app.protocol("WM_DELETE_WINDOW", cerrar_app)  # Captura el clic en la 'X' para cerrarlo
-
-app.cluster_partition = None
-app.grafo_clusterizado_actual = None
-# Iniciar el mainloop
-app.mainloop()
+    tk.Label(frame_controles_derechos, text="🔍 Zoom del grafo", **style).pack(pady=(25, 10))
+    zoom_slider = tk.Scale(frame_controles_derechos, from_=0.1, to=3, resolution=0.1, orient="horizontal",
+                           length=200, command=actualizar_zoom, bg="#f0f4f8")
+    zoom_slider.set(1.0)
+    zoom_slider.pack(pady=(10, 10))
+
+    tk.Label(frame_controles_derechos, text="🔠 Tamaño de texto", **style).pack(pady=(10, 10))
+    slider_texto = tk.Scale(frame_controles_derechos, from_=1, to=20, resolution=1, orient="horizontal",
+                            length=200, bg="#f0f4f8", command=lambda val: redibujar_grafo())
+    slider_texto.set(9)
+    slider_texto.pack(pady=(10, 10))
+    slider_grosor.config(command=lambda val: redibujar_grafo())
+
+    # Función para cerrar la aplicación
+    def cerrar_app():
+        app.quit()  # Esto asegura que el mainloop se detiene correctamente
+
+    app.protocol("WM_DELETE_WINDOW", cerrar_app)  # Captura el clic en la 'X' para cerrarlo
+
+    app.cluster_partition = None
+    app.grafo_clusterizado_actual = None
+    # Iniciar el mainloop
+    app.mainloop()